@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test 10: Shared Localization Cache Test
+This script starts a writer process that fills a SharedFrameRing as fast as
+it can, and reads it from this process at the same time. Every frame must
+come out whole (all bodies from the same write), a second writer must be
+refused, and the reader must fail once the writer is gone. It needs no
+server.
+"""
+
+import sys
+import os
+import subprocess
+import tempfile
+import time
+
+# Simple path setup
+project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'temporary'))
+src_path = os.path.join(project_root, 'src')
+sys.path.insert(0, project_root)
+sys.path.insert(0, src_path)
+
+from SharedLocalizationCache import SharedFrameRing, SharedLocalizationServerInterface
+
+BODIES = ["DeepRacer1", "Obstacle1", "Obstacle2", "Target1"]
+WRITE_TIME = 3.0
+
+# the arena of frame n: every body carries n as its timestamp
+def arena(n):
+    return dict([(name, "{},{},0.5,0.0,0.0,0.2,0.2".format(n, 0.01*i)) for i, name in enumerate(BODIES)])
+
+# run in the writer process
+def write_frames(path, seconds):
+    ring = SharedFrameRing(path, slots=4, max_bodies=len(BODIES), writer=True)
+    end_time = time.time() + seconds
+    n = 0
+    while time.time() < end_time:
+        ring.write(arena(n), time.time())
+        n += 1
+    ring.close()
+    print("writer: {} frames".format(n))
+
+def check(name, passed, details=""):
+    print("  [{}] {} {}".format("PASS" if passed else "FAIL", name, details))
+    return passed
+
+def main():
+    print("\n=== Test 10: Shared Localization Cache Test ===")
+    results = []
+    path = os.path.join(tempfile.mkdtemp(), "localization_cache")
+
+    print("\nStarting a writer for {:.0f} s...".format(WRITE_TIME))
+    writer = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--writer", path, str(WRITE_TIME)])
+    try:
+        end_time = time.time() + 5.0
+        while not os.path.exists(path) and time.time() < end_time:
+            time.sleep(0.01)
+        reader = SharedFrameRing(path)
+
+        # a second writer on the same ring
+        try:
+            SharedFrameRing(path, slots=4, max_bodies=len(BODIES), writer=True)
+            results.append(check("second writer refused", False))
+        except IOError as e:
+            results.append(check("second writer refused", True, str(e)))
+
+        # read while the writer overwrites the 4 slots
+        print("\nReading while the writer runs...")
+        interface = SharedLocalizationServerInterface(path)
+        (reads, torn, last, snapshot) = (0, 0, -1, None)
+        while writer.poll() is None:
+            try:
+                frame = reader.read()
+            except IOError:
+                # the writer ended between poll() and read()
+                break
+            if frame is None:
+                continue
+            (n, recv_time, response) = frame
+            stamps = set([state.split(",")[0] for state in response.values()])
+            if sorted(response.keys()) != sorted(BODIES) or stamps != set([str(n)]):
+                torn += 1
+            if n < last:
+                torn += 1
+            last = n
+            reads += 1
+            if snapshot is None:
+                snapshot = interface.snapshot("DeepRacer1")
+        results.append(check("frames read whole and in order", reads > 0 and torn == 0, "reads={}, torn={}, retries={}".format(reads, torn, reader.retries)))
+
+        results.append(check("snapshot through LocalizationServerInterface", snapshot is not None and snapshot.robot_state.endswith(",0.0,0.5,0.0,0.0,0.2,0.2"), snapshot and snapshot.robot_state))
+
+        # the writer has exited: the ring is stale
+        reader.next_writer_check = 0.0
+        try:
+            reader.read()
+            results.append(check("stale ring detected", False))
+        except IOError as e:
+            results.append(check("stale ring detected", True, str(e)))
+
+        # a new writer takes the ring over (its frame numbers go on) and refuses oversized frames
+        final = int(reader.header["latest"][0])
+        ring = SharedFrameRing(path, slots=4, max_bodies=len(BODIES), writer=True)
+        try:
+            ring.write({"x"*40: "untracked"}, time.time())
+            results.append(check("long name refused", False))
+        except ValueError as e:
+            results.append(check("long name refused", True, str(e)))
+        ring.write(arena(0), time.time())
+        reader.next_writer_check = 0.0
+        results.append(check("ring taken over by a new writer", reader.read()[0] == final + 1))
+        ring.close()
+    finally:
+        if writer.poll() is None:
+            writer.kill()
+        writer.wait()
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+    print("\n{} of {} checks passed.".format(sum(results), len(results)))
+    print("\nTest completed.")
+    return all(results)
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--writer":
+        write_frames(sys.argv[2], float(sys.argv[3]))
+    else:
+        sys.exit(0 if main() else 1)
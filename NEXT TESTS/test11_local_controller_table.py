@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test 11: Local Controller Table Test
+This script builds a controller download in the format RemoteSymbolicController
+expects from the pFaces server, loads it into a LocalControllerTable and checks
+its lookups against a plain search over the grid: cell centers, cell borders,
+states outside the grid and cells without actions. It also times the lookups.
+It needs no server.
+"""
+
+import sys
+import os
+import random
+import time
+
+# Simple path setup
+project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'temporary'))
+sym_control_path = os.path.join(project_root, 'examples', 'sym_control')
+sys.path.insert(0, project_root)
+sys.path.insert(0, sym_control_path)
+
+from LocalControllerTable import LocalControllerTable, FIELD_LB, FIELD_UB, FIELD_ETA, FIELD_CONTROLLER
+
+# a small (x, y, theta, v) grid: 11 x 9 x 5 x 3 cells
+LB = [-1.0, -0.8, -3.2, 0.0]
+UB = [1.0, 0.8, 3.2, 0.4]
+ETA = [0.2, 0.2, 1.6, 0.2]
+LOOKUPS = 20000
+
+def grid_dims():
+    return [int(round((u - l)/e)) + 1 for (l, u, e) in zip(LB, UB, ETA)]
+
+# the actions of a grid cell (i, j, k, l): none for every 7th cell, otherwise one
+# of a few lists, so that lists are shared between cells
+def cell_actions(i, j, k, l):
+    n = i + 3*j + 5*k + 7*l
+    if n % 7 == 0:
+        return None
+    return "|".join(["({:.2f},{:.2f})".format(0.1*a, -0.2 + 0.1*(n % 5)) for a in range(1 + n % 3)])
+
+def build_response():
+    dims = grid_dims()
+    items = []
+    index = 0
+    # flat index, first state dimension fastest
+    for l in range(dims[3]):
+        for k in range(dims[2]):
+            for j in range(dims[1]):
+                for i in range(dims[0]):
+                    actions = cell_actions(i, j, k, l)
+                    if actions is not None:
+                        items.append("{}:{}".format(index, actions))
+                    index += 1
+    random.shuffle(items)
+    vector = lambda values: "(" + ",".join([repr(v) for v in values]) + ")"
+    return {FIELD_LB: vector(LB), FIELD_UB: vector(UB), FIELD_ETA: vector(ETA), FIELD_CONTROLLER: ";".join(items)}
+
+# the expected actions of a state: nearest cell center, None outside the grid or without actions
+def expected_actions(state):
+    indices = []
+    for (x, lb, eta, n) in zip(state, LB, ETA, grid_dims()):
+        i = None
+        for c in range(n):
+            if abs(x - (lb + c*eta)) < eta/2:
+                i = c
+        if i is None:
+            return None
+        indices.append(i)
+    return cell_actions(*indices)
+
+def state_str(state):
+    return "(" + ",".join(["{:.6f}".format(x) for x in state]) + ")"
+
+def check(name, passed, details=""):
+    print("  [{}] {} {}".format("PASS" if passed else "FAIL", name, details))
+    return passed
+
+def main():
+    print("\n=== Test 11: Local Controller Table Test ===")
+    results = []
+    random.seed(1)
+
+    print("\nLoading the controller...")
+    start_time = time.time()
+    table = LocalControllerTable.from_response(build_response())
+    elapsed = time.time() - start_time
+    stats = table.get_stats()
+    results.append(check("grid size", stats["grid"] == grid_dims(), str(stats)))
+    print("  loaded in {:.3f} seconds".format(elapsed))
+
+    print("\nLooking up cell centers...")
+    dims = grid_dims()
+    wrong = 0
+    for l in range(dims[3]):
+        for k in range(dims[2]):
+            for j in range(dims[1]):
+                for i in range(dims[0]):
+                    state = [lb + c*eta for (lb, eta, c) in zip(LB, ETA, (i, j, k, l))]
+                    if table.actions(state_str(state)) != expected_actions(state):
+                        wrong += 1
+    results.append(check("every cell center", wrong == 0, "wrong={}".format(wrong)))
+
+    print("\nLooking up states outside the grid...")
+    outside = [[-1.2, 0.0, 0.0, 0.2], [1.2, 0.0, 0.0, 0.2], [0.0, 0.95, 0.0, 0.2], [0.0, 0.0, 0.0, -0.2]]
+    results.append(check("no actions outside", all(table.actions(state_str(s)) is None for s in outside)))
+
+    print("\nLooking up {} random states...".format(LOOKUPS))
+    states = [[random.uniform(lb - eta, ub + eta) for (lb, ub, eta) in zip(LB, UB, ETA)] for n in range(LOOKUPS)]
+    strings = [state_str(s) for s in states]
+    start_time = time.time()
+    answers = [table.actions(s) for s in strings]
+    elapsed = time.time() - start_time
+    # states closer than 1e-6 to a cell border may round either way
+    near_border = lambda s: any(abs(((x - lb)/eta) % 1.0 - 0.5) < 1e-5 for (x, lb, eta) in zip(s, LB, ETA))
+    wrong = sum([1 for (s, a) in zip(states, answers) if a != expected_actions(s) and not near_border(s)])
+    results.append(check("random states", wrong == 0, "wrong={}".format(wrong)))
+    print("  {:.1f} microseconds per lookup".format(1e6*elapsed/LOOKUPS))
+    print("  stats: {}".format(table.get_stats()))
+
+    print("\n{} of {} checks passed.".format(sum(results), len(results)))
+    print("\nTest completed.")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test 8: RetryPolicy Deadline Test
+This script checks that RetryPolicy retries failed requests, stops at the
+deadline it is given, and that RESTApiClient raises DeadlineExceeded instead
+of blocking past it. It needs no server.
+"""
+
+import sys
+import os
+import socket
+import time
+
+# Simple path setup
+project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'temporary'))
+src_path = os.path.join(project_root, 'src')
+sys.path.insert(0, project_root)
+sys.path.insert(0, src_path)
+
+from RetryPolicy import RetryPolicy, DeadlineExceeded, ServerError
+from RESTApiClient import RESTApiClient
+
+# a local port nobody listens on
+def unused_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+def check(name, passed, details=""):
+    print("  [{}] {} {}".format("PASS" if passed else "FAIL", name, details))
+    return passed
+
+def main():
+    print("\n=== Test 8: RetryPolicy Deadline Test ===")
+    results = []
+
+    # 1. two server errors, then an answer
+    print("\nRetrying two 5xx answers...")
+    calls = []
+    def flaky(timeout):
+        calls.append(timeout)
+        if len(calls) < 3:
+            raise ServerError("HTTP status 503")
+        return "ok"
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02)
+    result = policy.run("flaky", flaky)
+    results.append(check("answer after retries", result == "ok" and len(calls) == 3, "attempts={}".format(len(calls))))
+    results.append(check("retries counted", policy.get_stats()["flaky"]["retries"] == 2, str(policy.get_stats()["flaky"])))
+
+    # 2. every attempt fails: the last error is raised
+    print("\nFailing every attempt...")
+    def broken(timeout):
+        raise ServerError("HTTP status 500")
+    try:
+        policy.run("broken", broken)
+        results.append(check("last error raised", False))
+    except ServerError as e:
+        results.append(check("last error raised", True, repr(e)))
+
+    # 3. backoff longer than the budget: DeadlineExceeded before the deadline
+    print("\nBacking off past a 50 ms deadline...")
+    timeouts = []
+    def slow_broken(timeout):
+        timeouts.append(timeout)
+        raise ServerError("HTTP status 500")
+    policy = RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=1.0)
+    start_time = time.time()
+    deadline = start_time + 0.05
+    try:
+        policy.run("slow", slow_broken, deadline)
+        results.append(check("deadline exceeded", False))
+    except DeadlineExceeded as e:
+        elapsed = time.time() - start_time
+        results.append(check("deadline exceeded", elapsed <= 0.1, "after {:.3f} s: {}".format(elapsed, e)))
+    results.append(check("attempt timeout cut to the budget", all(0.0 < t <= 0.05 for t in timeouts), str(timeouts)))
+
+    # 4. deadline already passed: no attempt at all
+    print("\nStarting with no time left...")
+    del calls[:]
+    try:
+        RetryPolicy().run("late", flaky, time.time() - 1.0)
+        results.append(check("no attempt", False))
+    except DeadlineExceeded:
+        results.append(check("no attempt", len(calls) == 0))
+
+    # 5. RESTApiClient against a closed port
+    print("\nRESTApiClient GET to a closed port with a 100 ms deadline...")
+    rest_client = RESTApiClient("http://127.0.0.1:{}/OptiTrackRestServer".format(unused_port()),
+        retry_policy=RetryPolicy(max_attempts=10, base_delay=0.05, max_delay=0.05))
+    start_time = time.time()
+    try:
+        rest_client.restGETjson("", start_time + 0.1)
+        results.append(check("GET bounded by the deadline", False))
+    except (DeadlineExceeded, socket.error, IOError) as e:
+        elapsed = time.time() - start_time
+        results.append(check("GET bounded by the deadline", elapsed <= 0.25, "after {:.3f} s: {}".format(elapsed, repr(e))))
+    print("  stats: {}".format(rest_client.get_stats()))
+
+    print("\n{} of {} checks passed.".format(sum(results), len(results)))
+    print("\nTest completed.")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
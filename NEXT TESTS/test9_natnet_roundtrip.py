@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test 9: NatNet Round Trip Test
+This script encodes rigid-body frames as NatNet packets, sends them over
+UDP on this machine to a NatNetLocalizationSource and checks the poses it
+reports: position, heading, speed, untracked bodies and the speed reset
+after a dropout. It needs neither Motive nor the media server.
+"""
+
+import sys
+import os
+import math
+import socket
+import time
+
+# Simple path setup
+project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'temporary'))
+src_path = os.path.join(project_root, 'src')
+sys.path.insert(0, project_root)
+sys.path.insert(0, src_path)
+
+from NatNetLocalizationSource import NatNetLocalizationSource, encode_frame, decode_frame
+
+# NatNet rigid body id -> (name, w, h)
+BODIES = {1: ("DeepRacer1", 0.2, 0.3), 2: ("Obstacle1", 0.4, 0.4)}
+
+def free_udp_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+def check(name, passed, details=""):
+    print("  [{}] {} {}".format("PASS" if passed else "FAIL", name, details))
+    return passed
+
+# send one frame and wait until the source has decoded it
+def send(sock, source, port, frame_number, timestamp, bodies):
+    frames = source.rest_client.frames
+    sock.sendto(encode_frame(frame_number, timestamp, bodies), ("127.0.0.1", port))
+    end_time = time.time() + 1.0
+    while source.rest_client.frames == frames and time.time() < end_time:
+        time.sleep(0.001)
+    return source.rest_client.restGETjson()
+
+def state(response, name):
+    return [float(value) for value in response[name].split(",")]
+
+def main():
+    print("\n=== Test 9: NatNet Round Trip Test ===")
+    results = []
+
+    # 1. decode what was encoded, without the network
+    print("\nDecoding an encoded frame...")
+    packet = encode_frame(7, 12.5, [(1, 0.5, -0.25, math.pi/2, True)])
+    frame = decode_frame(bytearray(packet), len(packet))
+    bodies = frame[2]
+    results.append(check("frame number and timestamp", frame[0] == 7 and frame[1] == 12.5, str(frame[:2])))
+    results.append(check("rigid body", int(bodies["id"][0]) == 1 and abs(bodies["x"][0] - 0.5) < 1e-6 and abs(bodies["y"][0] + 0.25) < 1e-6))
+
+    # 2. the same over UDP
+    port = free_udp_port()
+    print("\nStreaming to 127.0.0.1:{}...".format(port))
+    source = NatNetLocalizationSource(BODIES, address="127.0.0.1", port=port)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        response = send(sock, source, port, 1, 0.0, [(1, 0.0, 0.0, 0.0, True), (2, 1.0, 1.0, 0.0, True)])
+        results.append(check("first frame received", source.wait_first(1.0) and "DeepRacer1" in response, str(response)))
+        (t, x, y, theta, v, w, h) = state(response, "DeepRacer1")
+        results.append(check("no speed on the first frame", v == 0.0 and (w, h) == (0.2, 0.3)))
+
+        response = send(sock, source, port, 2, 0.1, [(1, 0.1, 0.0, 0.0, True), (2, 1.0, 1.0, 0.0, True)])
+        (t, x, y, theta, v, w, h) = state(response, "DeepRacer1")
+        results.append(check("speed from the displacement", abs(v - 1.0) < 1e-3, "v={:.4f}".format(v)))
+
+        response = send(sock, source, port, 3, 0.2, [(1, 0.2, 0.0, math.pi/2, True), (2, 1.0, 1.0, 0.0, False)])
+        (t, x, y, theta, v, w, h) = state(response, "DeepRacer1")
+        results.append(check("heading from the quaternion", abs(theta - math.pi/2) < 1e-5, "theta={:.4f}".format(theta)))
+        results.append(check("untracked body", response["Obstacle1"] == "untracked"))
+
+        # the car is lost for a frame and re-tracked 1 m away: no speed spike
+        send(sock, source, port, 4, 0.3, [(1, 0.2, 0.0, 0.0, False), (2, 1.0, 1.0, 0.0, True)])
+        response = send(sock, source, port, 5, 0.4, [(1, 1.2, 0.0, 0.0, True), (2, 1.0, 1.0, 0.0, True)])
+        (t, x, y, theta, v, w, h) = state(response, "DeepRacer1")
+        results.append(check("no speed spike after a dropout", v == 0.0, "v={:.4f}".format(v)))
+
+        snapshot = source.snapshot("DeepRacer1")
+        results.append(check("snapshot through LocalizationServerInterface", snapshot.robot_state == response["DeepRacer1"], snapshot.robot_state))
+        print("  frames={}, decode errors={}".format(source.rest_client.frames, source.rest_client.decode_errors))
+    finally:
+        sock.close()
+        source.close()
+
+    print("\n{} of {} checks passed.".format(sum(results), len(results)))
+    print("\nTest completed.")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,86 @@
+import asyncio
+from AsyncRESTApiClient import AsyncRESTApiClient
+from PollingEngine import PollingEngine
+
+# asyncio version of RemoteSymbolicController (python 3 only)
+class AsyncRemoteSymbolicController():
+    def __init__(self, url):
+        #url is compute server
+        self.rest_client = AsyncRESTApiClient(url)
+        self.polling = PollingEngine()
+
+    # get the mode of the server
+    async def getMode(self):
+        return (await self.rest_client.restGETjson())["mode"]
+
+    # poll() until is_done(result), paced by the polling engine
+    async def poll_until(self, kind, poll, is_done):
+        schedule = self.polling.begin(kind)
+        result = await poll()
+        while not is_done(result):
+            await asyncio.sleep(schedule.next_delay())
+            result = await poll()
+        schedule.finish()
+        return result
+
+    # poll until the server reaches the given mode
+    async def wait_mode(self, mode, kind=None):
+        await self.poll_until(kind or mode, self.getMode, lambda current: current == mode)
+
+    def get_poll_stats(self):
+        return self.polling.get_stats()
+
+    # request a controller syntehsis operation from a SYM-Control server
+    async def synthesize_controller(self, obstacles_str, target_str, is_last_req):
+        await self.wait_mode("collect_synth")
+
+        json_data = {
+            "target_set":target_str,
+            "obst_set":obstacles_str,
+            "is_last_synth_request":"true" if is_last_req else "false",
+            "is_synth_requested":"true"
+        }
+        await self.rest_client.restPUTjson(json_data)
+
+        # wait for distribute_control => the synthesis is done
+        await self.wait_mode("distribute_control", "synthesis")
+
+    # given a state, get a list of controls for a synthesized controller
+    async def get_controls(self, state_str, is_last_request):
+        await self.wait_mode("distribute_control")
+
+        json_data = {
+            "current_state":state_str,
+            "is_control_requested":"true",
+            "is_last_control_request":"true" if is_last_request else "false"
+        }
+        await self.rest_client.restPUTjson(json_data)
+
+        return await self._collect_actions("control")
+
+    # a combined realtime version of the above two functions. with
+    # mode_ready=True the caller already awaited wait_mode("collect_synth"),
+    # e.g. concurrently with the localization fetch of the same tick
+    async def synthesize_controller_get_actions(self, obstacles_str, target_str, state_str, mode_ready=False):
+        if not mode_ready:
+            await self.wait_mode("collect_synth")
+
+        json_data = {
+            "target_set":target_str,
+            "obst_set":obstacles_str,
+            "is_last_synth_request":"false",
+            "is_synth_requested":"true",
+            "current_state":state_str,
+            "is_control_requested":"true",
+            "is_last_control_request":"true"
+        }
+        await self.rest_client.restPUTjson(json_data)
+
+        return await self._collect_actions("synthesis_control")
+
+    # wait for control ready, acknowledge and extract the actions
+    async def _collect_actions(self, kind):
+        data = await self.poll_until(kind, self.rest_client.restGETjson, lambda data: data["is_control_ready"] == "true")
+
+        await self.rest_client.restPUTjson({"is_control_recieved":"true"})
+        return data["actions_list"]
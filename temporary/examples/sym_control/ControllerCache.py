@@ -0,0 +1,100 @@
+import collections
+import re
+import threading
+import numpy as np
+
+DEFAULT_TOLERANCE = 0.02    # m (and rad, m/s), scene changes under it reuse a controller
+DEFAULT_CAPACITY = 8
+
+NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+# the bounds of the hyperrectangles of a stacked string "{x1,x2},{y1,y2},...|{...}"
+def parse_hrs(hrs_str):
+    return [tuple(float(v) for v in NUMBER.findall(hr)) for hr in hrs_str.split("|") if hr.strip() != ""]
+
+# a hashable scene: the target and the (unordered) obstacle set, every bound rounded
+# to a multiple of tolerance
+def scene_key(obstacles_str, target_str, tolerance=DEFAULT_TOLERANCE):
+    quantize = lambda hr: tuple(int(round(v/tolerance)) for v in hr)
+    return (tuple(quantize(hr) for hr in parse_hrs(target_str)), tuple(sorted(quantize(hr) for hr in parse_hrs(obstacles_str))))
+
+# the bounds of a scene as one array (None if it has no fixed shape), to compare
+# scenes whose rounded bounds fall on both sides of a multiple of tolerance
+def scene_bounds(obstacles_str, target_str):
+    hrs = parse_hrs(target_str) + sorted(parse_hrs(obstacles_str))
+    if len(set(len(hr) for hr in hrs)) > 1:
+        return None
+    return np.array(hrs)
+
+# whether two scene_bounds are within tolerance of each other
+def bounds_match(a, b, tolerance):
+    return a is not None and b is not None and a.shape == b.shape and np.abs(a - b).max() <= tolerance
+
+
+class CacheEntry():
+    def __init__(self, key, bounds, controller):
+        self.key = key
+        self.bounds = bounds
+        self.controller = controller
+        self.hits = 0
+
+
+# least recently used synthesized controllers keyed by their scene. a scene matches
+# an entry if their rounded bounds are equal, or if no bound moved by more than
+# tolerance (same obstacle count); anything else is a scene change. what a
+# controller is (a local table, None for the one the server holds) is up to the caller.
+class ControllerCache():
+    def __init__(self, tolerance=DEFAULT_TOLERANCE, capacity=DEFAULT_CAPACITY):
+        self.tolerance = tolerance
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # (key, entry) of the scene without counting it as a use, the entry being None on a miss
+    def find(self, obstacles_str, target_str):
+        key = scene_key(obstacles_str, target_str, self.tolerance)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                bounds = scene_bounds(obstacles_str, target_str)
+                for candidate in reversed(list(self.entries.values())):
+                    if bounds_match(candidate.bounds, bounds, self.tolerance):
+                        entry = candidate
+                        break
+        return (key, entry)
+
+    # (key, entry) of the scene, the entry being None on a miss
+    def lookup(self, obstacles_str, target_str):
+        (key, entry) = self.find(obstacles_str, target_str)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return (key, None)
+            self.entries.pop(entry.key, None)
+            self.entries[entry.key] = entry
+            entry.hits += 1
+            self.hits += 1
+            return (entry.key, entry)
+
+    def put(self, key, obstacles_str, target_str, controller):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = CacheEntry(key, scene_bounds(obstacles_str, target_str), controller)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def get_stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
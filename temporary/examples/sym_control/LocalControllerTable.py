@@ -0,0 +1,89 @@
+import math
+import numpy as np
+from ControllerCache import NUMBER
+
+# fields of the controller download. they are not part of the documented pFaces
+# REST dictionary: a server supporting downloads is assumed to list CONTROLLER_READY
+# in its dictionary ("false" until requested; a server without it is not asked), and
+# to answer a PUT of CONTROLLER_REQUESTED with CONTROLLER_READY set and the controller
+# in these fields:
+#   ss_lb, ss_ub, ss_eta: "(x,y,theta,v)" bounds and cell widths of the state grid
+#   controller:           "cell:(a,b)|(a,b);cell:..." for every cell with actions, the
+#                         cell being the flat grid index, first state dimension fastest
+CONTROLLER_REQUESTED = "is_controller_requested"
+CONTROLLER_READY = "is_controller_ready"
+CONTROLLER_RECEIVED = "is_controller_recieved"
+FIELD_LB = "ss_lb"
+FIELD_UB = "ss_ub"
+FIELD_ETA = "ss_eta"
+FIELD_CONTROLLER = "controller"
+
+def parse_vector(vector_str):
+    return [float(v) for v in NUMBER.findall(vector_str)]
+
+
+# a synthesized controller held locally: the state grid (cells centered on
+# lb + i*eta, as in SCOTS/pFaces) and, for every cell with actions, the index of its
+# action list. the cells are one sorted int64 array searched with np.searchsorted,
+# so a lookup takes microseconds and needs no server.
+class LocalControllerTable():
+    def __init__(self, lb, ub, eta, cells, list_ids, action_lists):
+        self.lb = list(lb)
+        self.eta = list(eta)
+        self.dims = [int(math.floor((u - l)/e + 0.5)) + 1 for (l, u, e) in zip(lb, ub, eta)]
+        self.strides = [int(np.prod(self.dims[:i])) for i in range(len(self.dims))]
+        order = np.argsort(cells)
+        self.cells = np.asarray(cells, dtype=np.int64)[order]
+        self.list_ids = np.asarray(list_ids, dtype=np.int32)[order]
+        self.action_lists = action_lists
+        self.lookups = 0
+        self.misses = 0
+
+    @classmethod
+    def from_response(cls, data):
+        cells = []
+        list_ids = []
+        action_lists = []
+        ids = {}
+        for item in data[FIELD_CONTROLLER].split(";"):
+            (cell, sep, actions) = item.partition(":")
+            if sep == "":
+                continue
+            actions = actions.replace(" ", "")
+            if actions not in ids:
+                ids[actions] = len(action_lists)
+                action_lists.append(actions)
+            cells.append(int(cell))
+            list_ids.append(ids[actions])
+        return cls(parse_vector(data[FIELD_LB]), parse_vector(data[FIELD_UB]), parse_vector(data[FIELD_ETA]), cells, list_ids, action_lists)
+
+    # flat index of the cell of a state, -1 outside the grid
+    def cell(self, state):
+        index = 0
+        for (x, lb, eta, n, stride) in zip(state, self.lb, self.eta, self.dims, self.strides):
+            i = int(math.floor((x - lb)/eta + 0.5))
+            if i < 0 or i >= n:
+                return -1
+            index += i*stride
+        return index
+
+    # the actions list of a state string "(x,y,theta,v)", None if no cell of the
+    # controller holds the state
+    def actions(self, state_str):
+        self.lookups += 1
+        index = self.cell(parse_vector(state_str))
+        if index >= 0:
+            i = int(np.searchsorted(self.cells, index))
+            if i < len(self.cells) and self.cells[i] == index:
+                return self.action_lists[self.list_ids[i]]
+        self.misses += 1
+        return None
+
+    def get_stats(self):
+        return {
+            "cells": len(self.cells),
+            "action_lists": len(self.action_lists),
+            "grid": self.dims,
+            "lookups": self.lookups,
+            "misses": self.misses
+        }
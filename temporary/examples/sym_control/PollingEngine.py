@@ -0,0 +1,92 @@
+import threading
+import time
+from RetryPolicy import DeadlineExceeded
+
+FAST_INTERVAL = 0.002       # s between polls in the fast phase
+FAST_PHASE = 0.02           # s of fast polling
+MAX_INTERVAL = 0.05         # s, cap of the backoff
+BACKOFF = 1.5
+HINT_LEAD = 0.8             # share of the expected duration slept before polling
+HINT_GAIN = 0.3             # weight of the newest duration in the expected one
+
+# the polls of one wait: the first poll goes out at once, then every FAST_INTERVAL
+# for FAST_PHASE seconds, then the interval grows by BACKOFF up to MAX_INTERVAL.
+# when the engine expects the wait to last E seconds (learned from the previous
+# waits of the same kind), the fast phase only starts after HINT_LEAD*E.
+class PollSchedule():
+    def __init__(self, engine, kind, expected):
+        self.engine = engine
+        self.kind = kind
+        self.start = time.time()
+        self.fast_start = self.start
+        self.expected = expected
+        self.polls = 1
+        self.interval = FAST_INTERVAL
+        self.last_delay = 0.0
+
+    # how long to sleep before the next poll
+    def next_delay(self):
+        now = time.time()
+        if self.expected is not None and now - self.start < HINT_LEAD*self.expected:
+            delay = self.start + HINT_LEAD*self.expected - now
+            self.fast_start = now + delay
+        elif now - self.fast_start < FAST_PHASE:
+            delay = FAST_INTERVAL
+        else:
+            self.interval = min(MAX_INTERVAL, self.interval*BACKOFF)
+            delay = self.interval
+        self.polls += 1
+        self.last_delay = delay
+        return delay
+
+    def finish(self):
+        self.engine.record(self.kind, time.time() - self.start, self.polls, self.last_delay)
+
+
+# paces the status polling of the pFaces server and keeps, per kind of wait (e.g.
+# "synthesis", "control"), the expected duration and the poll counters. wasted_wait
+# is the last sleep of a wait: an upper bound on how long the result was ready
+# before it was seen.
+class PollingEngine():
+    def __init__(self, use_hints=True):
+        self.use_hints = use_hints
+        self.expected = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def begin(self, kind):
+        return PollSchedule(self, kind, self.expected.get(kind) if self.use_hints else None)
+
+    # poll() until is_done(result), and return that result. with a timeout (seconds),
+    # DeadlineExceeded is raised once it has passed
+    def wait(self, kind, poll, is_done, timeout=None):
+        schedule = self.begin(kind)
+        result = poll()
+        while not is_done(result):
+            if timeout is not None and time.time() - schedule.start > timeout:
+                raise DeadlineExceeded(kind + ": not done after " + str(timeout) + " s")
+            time.sleep(schedule.next_delay())
+            result = poll()
+        schedule.finish()
+        return result
+
+    def record(self, kind, duration, polls, wasted_wait):
+        with self.lock:
+            expected = self.expected.get(kind)
+            self.expected[kind] = duration if expected is None else expected + HINT_GAIN*(duration - expected)
+
+            stats = self.stats.setdefault(kind, {"requests": 0, "polls": 0, "duration": 0.0, "wasted_wait": 0.0})
+            stats["requests"] += 1
+            stats["polls"] += polls
+            stats["duration"] += duration
+            stats["wasted_wait"] += wasted_wait
+            stats["last"] = {"polls": polls, "duration": duration, "wasted_wait": wasted_wait}
+
+    # per kind: totals over all waits, the last wait, and the expected duration
+    def get_stats(self):
+        with self.lock:
+            stats = {}
+            for kind, kind_stats in self.stats.items():
+                stats[kind] = dict(kind_stats)
+                stats[kind]["expected"] = self.expected.get(kind)
+            return stats
@@ -1,23 +1,70 @@
-import RESTApiClient
+import threading
 import time
+import RESTApiClient
+from PollingEngine import PollingEngine
+from ControllerCache import ControllerCache
+import LocalControllerTable
+from RetryPolicy import DeadlineExceeded
 
-SLEEP_TIME = 0.005
+DUMMY_STATE = "(0,0,0,0)"
+DOWNLOAD_TIMEOUT = 5.0      # s, controllers not sent by then are taken as unsupported
+SERVER_WAIT_TIMEOUT = 0.5   # s synthesize_scene waits for a background synthesis to release the server
+PRESYNTHESIS_TIMEOUT = 120.0
+LOCK_POLL = 0.005
 
 class RemoteSymbolicController():
-    def __init__(self, url):
+    def __init__(self, url, cache=None, local_controls=False):
         #url is compute server
         self.rest_client = RESTApiClient.RESTApiClient(url)
+        # paces the status polls, see get_poll_stats()
+        self.polling = PollingEngine()
+        # download every synthesized controller and answer get_controls locally
+        self.local_controls = local_controls
+        if local_controls and cache is None:
+            cache = ControllerCache()
+        # scene -> synthesized controller (a ControllerCache), used by get_scene_actions()
+        self.cache = cache
+        # scene key of the controller the server is distributing, None if unknown
+        self.session = None
+        # the downloaded controller get_controls answers from (a LocalControllerTable)
+        # and its scene (obstacles_str, target_str)
+        self.table = None
+        self.table_scene = None
+        # lookups the table had no cell for, answered by the server instead
+        self.table_misses = 0
+        # False once a download failed: the server is then queried as without local_controls
+        self.download_supported = local_controls
+        # held by synthesize_scene and presynthesize while they use the server
+        self.server_lock = threading.RLock()
 
     # get the mode of the server
     def getMode(self):
         return self.rest_client.restGETjson()["mode"]
 
+    # poll until the server reaches the given mode; kind names the wait in the stats
+    def wait_mode(self, mode, kind, timeout=None):
+        self.polling.wait(kind, self.getMode, lambda current: current == mode, timeout)
+
+    # poll until the requested actions are ready and return the server's data
+    def wait_control_ready(self, kind):
+        return self.polling.wait(kind, self.rest_client.restGETjson, lambda data: data["is_control_ready"] == "true")
+
+    # poll counts, durations and wasted wait per kind of wait
+    def get_poll_stats(self):
+        return self.polling.get_stats()
+
     # request a controller syntehsis operation from a SYM-Control server
     def synthesize_controller(self, obstacles_str, target_str, is_last_req):
+        self.table = None
+        self.table = self.run_synthesis(obstacles_str, target_str, is_last_req)
+        self.table_scene = (obstacles_str, target_str)
+
+    # the synthesis itself; returns the downloaded controller with local_controls (and
+    # download), else None
+    def run_synthesis(self, obstacles_str, target_str, is_last_req, timeout=None, download=True):
         # wait for synth-mode
-        mode = ""
-        while mode != "collect_synth":
-            mode = self.getMode()
+        self.wait_mode("collect_synth", "collect_synth", timeout)
+        self.end_session()
 
         # put request
         if is_last_req:
@@ -34,16 +81,64 @@ class RemoteSymbolicController():
         self.rest_client.restPUTjson(json_data)
 
         # wait for distribute_control => the synthesis is done
-        mode = ""
-        while mode != "distribute_control":
-            mode = self.getMode()
+        self.wait_mode("distribute_control", "synthesis", timeout)
+
+        # keep a local copy and free the server for the next synthesis
+        if self.download_supported and download:
+            table = self.download_controller()
+            if table is not None:
+                self.request_controls(DUMMY_STATE, True)
+                return table
+        return None
+
+    # fetch the synthesized controller as a whole (see LocalControllerTable for the
+    # assumed fields). returns None, and stops trying for later syntheses, if the
+    # server does not list the download fields or does not send the controller within
+    # DOWNLOAD_TIMEOUT; its control session stays open for request_controls
+    def download_controller(self):
+        if LocalControllerTable.CONTROLLER_READY not in self.rest_client.restGETjson():
+            self.download_supported = False
+            return None
+        self.rest_client.restPUTjson({LocalControllerTable.CONTROLLER_REQUESTED:"true"})
+        try:
+            data = self.polling.wait("controller_download", self.rest_client.restGETjson, lambda data: data.get(LocalControllerTable.CONTROLLER_READY) == "true", DOWNLOAD_TIMEOUT)
+            table = LocalControllerTable.LocalControllerTable.from_response(data)
+        except (DeadlineExceeded, KeyError, ValueError):
+            self.download_supported = False
+            return None
+        self.rest_client.restPUTjson({LocalControllerTable.CONTROLLER_RECEIVED:"true"})
+        return table
 
     # given a state, get a list of controls for a synthesized controller
     def get_controls(self, state_str, is_last_request):
+        if self.table is not None:
+            actions = self.table.actions(state_str)
+            if actions is not None:
+                return actions
+            self.table_misses += 1
+            self.restore_server_controller()
+        return self.request_controls(state_str, is_last_request)
+
+    # a state the downloaded controller has no cell for is asked to the server, whose
+    # control session was closed after the download: synthesize the table's scene on
+    # the server again (without downloading) and leave the server answering get_controls
+    def restore_server_controller(self):
+        (obstacles_str, target_str) = self.table_scene
+        self.acquire_server(SERVER_WAIT_TIMEOUT)
+        try:
+            if self.session is not None or self.getMode() == "distribute_control":
+                self.request_controls(DUMMY_STATE, True)
+            self.run_synthesis(obstacles_str, target_str, False, download=False)
+            self.table = None
+            if self.cache is not None:
+                self.session = self.cache.find(obstacles_str, target_str)[0]
+        finally:
+            self.server_lock.release()
+
+    # get_controls from the server
+    def request_controls(self, state_str, is_last_request):
         # wait for synth-mode
-        mode = ""
-        while mode != "distribute_control":
-            mode = self.getMode()
+        self.wait_mode("distribute_control", "distribute_control")
 
         # put action request
         if is_last_request:
@@ -59,26 +154,108 @@ class RemoteSymbolicController():
         self.rest_client.restPUTjson(json_data)
 
         # wait for synth-mode
-        data = ""
-        is_control_ready = ""
-        while is_control_ready != "true":
-            data =self.rest_client.restGETjson()
-            is_control_ready = data["is_control_ready"]
+        data = self.wait_control_ready("control")
         
         # acknowledge
         json_data = {"is_control_recieved":"true"}
         self.rest_client.restPUTjson(json_data)
 
+        if is_last_request:
+            self.end_session()
+
         # extract actions
         return data["actions_list"]
 
+    # forget the server's controller (its control session is closed)
+    def end_session(self):
+        if self.session is not None and self.cache is not None:
+            self.cache.discard(self.session)
+        self.session = None
+
+    # make a controller for the scene ready for get_controls, either on the server or
+    # downloaded (local_controls); returns False if one was cached, True after a new synthesis
+    def synthesize_scene(self, obstacles_str, target_str):
+        (key, entry) = self.cache.lookup(obstacles_str, target_str)
+        if entry is not None and (entry.controller is not None or key == self.session):
+            self.table = entry.controller
+            self.table_scene = (obstacles_str, target_str)
+            return False
+
+        self.acquire_server(SERVER_WAIT_TIMEOUT)
+        try:
+            # presynthesize may have made it while we waited
+            (key, entry) = self.cache.find(obstacles_str, target_str)
+            if entry is not None and (entry.controller is not None or key == self.session):
+                self.table = entry.controller
+                self.table_scene = (obstacles_str, target_str)
+                return False
+
+            # the server holds one controller: close the running control session first
+            if self.session is not None or self.getMode() == "distribute_control":
+                self.request_controls(DUMMY_STATE, True)
+            self.synthesize_controller(obstacles_str, target_str, False)
+            if self.table is None:
+                self.session = key
+            self.cache.put(key, obstacles_str, target_str, self.table)
+            return True
+        finally:
+            self.server_lock.release()
+
+    # take server_lock, raising DeadlineExceeded if a background synthesis keeps it
+    # longer than timeout (Lock.acquire has no timeout in python 2)
+    def acquire_server(self, timeout):
+        end = time.time() + timeout
+        while not self.server_lock.acquire(False):
+            if time.time() > end:
+                raise DeadlineExceeded("server busy with a background synthesis")
+            time.sleep(LOCK_POLL)
+
+    # synthesize and download a controller for a scene into the cache without switching
+    # get_controls to it (local_controls only, see SpeculativePlanner). a synthesis
+    # running on the server cannot be aborted: is_cancelled() is checked before it
+    # starts and its result is dropped if it turns true meanwhile. nothing is done while
+    # the control loop uses the server or once downloads turned out unsupported, and
+    # the synthesis gives up after PRESYNTHESIS_TIMEOUT. returns whether a controller
+    # was added
+    def presynthesize(self, obstacles_str, target_str, is_cancelled=lambda: False):
+        if not self.local_controls:
+            raise ValueError("presynthesize needs local_controls: the server holds only the controller in use")
+        if not self.download_supported or not self.server_lock.acquire(False):
+            return False
+        try:
+            (key, entry) = self.cache.find(obstacles_str, target_str)
+            if entry is not None or is_cancelled():
+                return False
+            if self.session is not None or self.getMode() == "distribute_control":
+                self.request_controls(DUMMY_STATE, True)
+            table = self.run_synthesis(obstacles_str, target_str, False, PRESYNTHESIS_TIMEOUT)
+            if table is None:
+                # the download failed: the server holds this controller now
+                self.session = key
+            if is_cancelled():
+                return False
+            self.cache.put(key, obstacles_str, target_str, table)
+            return True
+        finally:
+            self.server_lock.release()
+
+    # like synthesize_controller_get_actions, but only requests a synthesis when the
+    # scene changed since the last one (see ControllerCache); otherwise only the
+    # control query goes to the server
+    def get_scene_actions(self, obstacles_str, target_str, state_str):
+        if self.cache is None:
+            return self.synthesize_controller_get_actions(obstacles_str, target_str, state_str)
+        self.synthesize_scene(obstacles_str, target_str)
+        return self.get_controls(state_str, False)
+
     # a combined realtime version of the above two functions
     def synthesize_controller_get_actions(self, obstacles_str, target_str, state_str):
+        # close a control session left open by get_scene_actions
+        if self.session is not None:
+            self.request_controls(DUMMY_STATE, True)
+
         # wait for synth-mode
-        mode = self.getMode()
-        while mode != "collect_synth":
-            time.sleep(SLEEP_TIME)
-            mode = self.getMode()
+        self.wait_mode("collect_synth", "collect_synth")
 
         json_data = {
             "target_set":target_str,
@@ -93,17 +270,13 @@ class RemoteSymbolicController():
         self.rest_client.restPUTjson(json_data)
 
         # wait for control ready
-        data = ""
-        is_control_ready = ""
         #waiting got is_control_ready to return true, and then we acknowlede we recieved it and extract action list
-        while is_control_ready != "true":
-            time.sleep(SLEEP_TIME)
-            data =self.rest_client.restGETjson()
-            is_control_ready = data["is_control_ready"]
+        data = self.wait_control_ready("synthesis_control")
         
         # acknowledge
         json_data = {"is_control_recieved":"true"}
         self.rest_client.restPUTjson(json_data)
+        self.end_session()
 
         # extract actions
         return data["actions_list"]
@@ -0,0 +1,113 @@
+import threading
+import time
+from ControllerCache import scene_bounds, bounds_match
+
+# one background synthesis
+class SpeculationJob():
+    def __init__(self, obstacles_str, target_str):
+        self.obstacles_str = obstacles_str
+        self.target_str = target_str
+        self.bounds = scene_bounds(obstacles_str, target_str)
+        self.start = time.time()
+        self.end = None
+        self.cancelled = False
+        self.added = False
+        self.arrived = False
+        self.done = threading.Event()
+
+
+# once the controller for the current target is ready, synthesizes the one for the
+# next target in the background (RemoteSymbolicController.presynthesize, so
+# local_controls only), and the switch on arrival needs no synthesis. the server runs
+# one synthesis at a time: a prefetch waits until the running one is done (and is
+# skipped while the control loop uses the server), and a
+# running one is cancelled when its scene no longer matches (an obstacle moved by more
+# than the cache tolerance; see cancel_stale). pFaces cannot abort a synthesis, so a
+# cancelled job still keeps the server busy until it ends, but its result is dropped
+# and a job that has not reached the server yet is skipped. arrive() adds the synthesis time the robot did not have
+# to wait for to time_saved.
+class SpeculativePlanner():
+    def __init__(self, sym_control):
+        self.sym_control = sym_control
+        self.tolerance = sym_control.cache.tolerance
+        self.job = None
+        self.lock = threading.Lock()
+
+        # metrics
+        self.prefetches = 0
+        self.cancelled = 0
+        self.failures = 0
+        self.wasted_time = 0.0      # s of synthesis spent on cancelled jobs
+        self.arrivals = 0
+        self.ready = 0              # arrivals with the controller already made
+        self.partial = 0            # arrivals while it was still being made
+        self.time_saved = 0.0
+
+    # cancel the running job if the obstacles moved since it was started
+    def cancel_stale(self, obstacles_str):
+        with self.lock:
+            job = self.job
+            if job is not None and not job.done.is_set() and not job.cancelled \
+                    and not bounds_match(job.bounds, scene_bounds(obstacles_str, job.target_str), self.tolerance):
+                job.cancelled = True
+                self.cancelled += 1
+
+    # make the controller of a scene in the background, unless it is cached or being made
+    def prefetch(self, obstacles_str, target_str):
+        bounds = scene_bounds(obstacles_str, target_str)
+        with self.lock:
+            job = self.job
+            if job is not None and not job.done.is_set():
+                if not job.cancelled and not bounds_match(job.bounds, bounds, self.tolerance):
+                    job.cancelled = True
+                    self.cancelled += 1
+                return
+            if self.sym_control.cache.find(obstacles_str, target_str)[1] is not None:
+                return
+            job = SpeculationJob(obstacles_str, target_str)
+            self.job = job
+            self.prefetches += 1
+
+        thread = threading.Thread(target=self.run, args=(job,), name="SpeculativePlanner")
+        thread.daemon = True
+        thread.start()
+
+    def run(self, job):
+        try:
+            job.added = self.sym_control.presynthesize(job.obstacles_str, job.target_str, lambda: job.cancelled)
+        except Exception:
+            self.failures += 1
+        job.end = time.time()
+        if job.cancelled:
+            self.wasted_time += job.end - job.start
+        job.done.set()
+
+    # the robot switches to the scene's target now; returns the seconds of synthesis saved
+    def arrive(self, obstacles_str, target_str):
+        self.arrivals += 1
+        job = self.job
+        if job is None or job.cancelled or job.arrived or not bounds_match(job.bounds, scene_bounds(obstacles_str, target_str), self.tolerance):
+            return 0.0
+        job.arrived = True
+        if job.done.is_set():
+            if not job.added:
+                return 0.0
+            self.ready += 1
+            saved = job.end - job.start
+        else:
+            self.partial += 1
+            saved = time.time() - job.start
+        self.time_saved += saved
+        return saved
+
+    def get_stats(self):
+        return {
+            "prefetches": self.prefetches,
+            "cancelled": self.cancelled,
+            "failures": self.failures,
+            "wasted_time": self.wasted_time,
+            "arrivals": self.arrivals,
+            "ready": self.ready,
+            "partial": self.partial,
+            "time_saved": self.time_saved
+        }
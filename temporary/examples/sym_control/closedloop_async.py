@@ -0,0 +1,105 @@
+import asyncio
+from signal import signal, SIGINT
+from sys import exit
+from sys import path
+
+# insert src into script path
+path.insert(1, '../../src')
+
+import DeepRacer
+from AsyncDeepRacerController import AsyncDeepRacerController
+from AsyncRemoteSymbolicController import AsyncRemoteSymbolicController
+
+# the asyncio version of closedloop_rt.py: every loop waits for the sym-control
+# server to be ready for a synthesis request while the arena is being fetched
+
+ROBOT_NAME = "DeepRacer1"
+LOCALIZATION_SERVER_IPPORT = "192.168.1.194:12345"
+COMPUTE_SERVER_IPPORT = "192.168.1.144:12345"
+SYMCONTROL_SERVER_URI = "http://" + COMPUTE_SERVER_IPPORT + "/pFaces/REST/dictionary/"+ROBOT_NAME
+curr_target = 0
+tau = 0.25
+sym_control = AsyncRemoteSymbolicController(SYMCONTROL_SERVER_URI)
+
+def new_control_task(loc_server, logger):
+    return False
+
+# runs concurrently with the localization fetch of every loop
+async def prepare_control():
+    await sym_control.wait_mode("collect_synth")
+
+def get_next_action(last_action, new_actions, logger):
+    new_actions_conc = []
+    good_candidate_idx = 0
+    idx = 0
+    for action_str in new_actions:
+        new_action = action_str.replace("(","").replace(")","").split(',')
+
+        if (len(new_action) != 2):
+            logger.log("Found invalid action in the list of actions.")
+            return "stop"
+
+        new_action = [DeepRacer.unmap_angle(float(new_action[0])), DeepRacer.unmap_trottle(float(new_action[1]))]
+        new_actions_conc.append(new_action)
+
+        # selection criterion: first action with same direction as last action
+        if last_action != None:
+            if last_action[1]>0 and new_action[1]>0:
+                good_candidate_idx = idx
+                break
+            if last_action[1]<0 and new_action[1]<0:
+                good_candidate_idx = idx
+                break
+
+        idx += 1
+
+    return new_actions_conc[good_candidate_idx]
+
+
+last_action = None
+async def get_control_action(arena, s, logger, logger_states):
+    global curr_target
+    global last_action
+
+    # prepare targets/obstacles from the arena snapshot of this loop
+    hrListTar = arena.get_hyper_rec_str("Target")
+    obstacles_str = arena.stacked_hrs("Obstacle")
+    if len(hrListTar) == 0:
+        logger.log("Exiting as no targets in the scene.")
+        return [True, None]
+
+    # set target
+    curr_target = curr_target % len(hrListTar)
+    target_str = hrListTar[curr_target][1]
+    target_vals = target_str.replace('{','').replace('}','').split(',')
+
+    # are we already in a target ?
+    if (s[0] >= float(target_vals[0]) and s[0] <= float(target_vals[1])) and (s[1] >= float(target_vals[2]) and s[1] <= float(target_vals[3])):
+        logger.log("Reached the target set #" + str(curr_target) + ". S=" + str(s))
+        curr_target += 1
+        return [True, "stop"]
+
+    # synthsize a controller + get actions, the server mode was awaited in prepare_control()
+    s_send = str(s).replace('[','(').replace(']',')')
+    u_psi_list = await sym_control.synthesize_controller_get_actions(obstacles_str, target_str, s_send, mode_ready=True)
+
+    actions_list = u_psi_list.replace(" ","").split('|')
+    if len(actions_list) == 0:
+        logger.log("The controller returned no actions.")
+        return [True, "stop"]
+
+    action = get_next_action(last_action, actions_list, logger)
+    last_action = action
+    return [True, action]
+
+def after_control_task(logger):
+    return False
+
+# signal handler
+def sig_handler(signal_received, frame):
+    exit(0)
+
+if __name__ == "__main__":
+    signal(SIGINT, sig_handler)
+    dr_controller = AsyncDeepRacerController(tau, ROBOT_NAME, LOCALIZATION_SERVER_IPPORT, new_control_task, get_control_action, after_control_task, prepare_control)
+    asyncio.run(dr_controller.spin())
@@ -10,8 +10,12 @@ path.insert(1, '../../src')
 import DeepRacer
 from DeepRacerController import DeepRacerController
 from RemoteSymbolicController import RemoteSymbolicController
+from ControllerCache import ControllerCache
 
 STOP_AFTER_LAST_TARGET = False
+# download every synthesized controller and look actions up locally (needs a server
+# that supports the controller download, see LocalControllerTable)
+LOCAL_CONTROLS = False
 ROBOT_NAME = "DeepRacer1"
 LOCALIZATION_SERVER_IPPORT = "192.168.1.194:12345"
 COMPUTE_SERVER_IPPORT = "192.168.1.147:12345"
@@ -20,7 +24,8 @@ curr_target = 0
 target_vals = []
 hrListTar = []
 tau = 0.25
-sym_control = RemoteSymbolicController(SYMCONTROL_SERVER_URI)
+# synthesize only when the obstacles or the target moved
+sym_control = RemoteSymbolicController(SYMCONTROL_SERVER_URI, cache=ControllerCache(), local_controls=LOCAL_CONTROLS)
 
 # making a dummy request to close the current ccontrol-requests session
 def send_dummy_getcontrol_req():
@@ -57,15 +62,13 @@ def new_control_task(loc_server, logger):
 
     # make a synthsize controller request and wait for the controller
     try:
-        mode = sym_control.getMode()
-        if mode != "distribute_control":
-            logger.log("Requesting a control synthesis ...")
-            logger.log("Obstacles: " + obstacles_str)
-            logger.log("Target: " + target_str)
-            sym_control.synthesize_controller(obstacles_str, target_str, False)
+        logger.log("Requesting a control synthesis ...")
+        logger.log("Obstacles: " + obstacles_str)
+        logger.log("Target: " + target_str)
+        if sym_control.synthesize_scene(obstacles_str, target_str):
             logger.log("Controller synthesis done.")
         else:
-            logger.log("Controller synthesis skipped as we found the server ready for control-requests.")
+            logger.log("Controller synthesis skipped as the server already has a controller for this scene.")
         return False
     except:
         logger.log("Controller synthesis Failed.")
@@ -102,7 +105,7 @@ def get_next_action(last_action, new_actions, state, logger):
     
 
 last_action = None
-def get_control_action(loc_server, s, logger):
+def get_control_action(arena, s, logger, logger_states):
     global curr_target
     global target_vals
     global hrListTar
@@ -114,9 +117,9 @@ def get_control_action(loc_server, s, logger):
         return [True, "stop"]
 
     # prepare targets/obstacles
-    hrListTar = loc_server.get_hyper_rec_str("Target")
+    hrListTar = arena.get_hyper_rec_str("Target")
     target_str = stack_hrs(hrListTar)
-    obstacles_str = stack_hrs(loc_server.get_hyper_rec_str("Obstacle"))
+    obstacles_str = arena.stacked_hrs("Obstacle")
     if (target_str == ""):
         logger.log("Exiting as no targets in the scene.")
         return True
@@ -130,7 +133,7 @@ def get_control_action(loc_server, s, logger):
     #logger.log("State = " + s_send)
 
     try:
-        u_psi_list = sym_control.synthesize_controller_get_actions(obstacles_str, target_str, s_send) 
+        u_psi_list = sym_control.get_scene_actions(obstacles_str, target_str, s_send)
     except:
         logger.log("Failed to get actions list from the sym-control server.")
         return [True, None]
@@ -171,7 +174,7 @@ def sig_handler(signal_received, frame):
 
 if __name__ == "__main__":
     signal(SIGINT, sig_handler)
-    dr_controller = DeepRacerController(tau, ROBOT_NAME, LOCALIZATION_SERVER_IPPORT, new_control_task, get_control_action, after_control_task)
+    dr_controller = DeepRacerController(tau, ROBOT_NAME, LOCALIZATION_SERVER_IPPORT, new_control_task, get_control_action, after_control_task, WarmUpURLs=[SYMCONTROL_SERVER_URI])
     dr_controller.spin()
     
     
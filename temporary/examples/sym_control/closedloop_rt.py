@@ -15,6 +15,7 @@ path.insert(1, '../../src')
 
 import DeepRacer
 from RemoteSymbolicController import RemoteSymbolicController
+from SpeculativePlanner import SpeculativePlanner
 from DeepRacerController import DeepRacerController
 logging.info("Imported DeepRacer and RemoteSymbolicController")
 
@@ -22,6 +23,9 @@ logging.info("Imported DeepRacer and RemoteSymbolicController")
 
 
 STOP_AFTER_LAST_TARGET = False
+# synthesize only on scene changes, and the next target's controller in the background
+# while driving to the current one (needs the controller download, see LocalControllerTable)
+SPECULATE = False
 ROBOT_NAME = "DeepRacer1"
 LOCALIZATION_SERVER_IPPORT = "192.168.1.194:12345"
 COMPUTE_SERVER_IPPORT = "192.168.1.144:12345"
@@ -32,7 +36,8 @@ curr_target = 0
 target_vals = []
 hrListTar = []
 tau = 0.0
-sym_control = RemoteSymbolicController(SYMCONTROL_SERVER_URI)
+sym_control = RemoteSymbolicController(SYMCONTROL_SERVER_URI, local_controls=SPECULATE)
+planner = SpeculativePlanner(sym_control) if SPECULATE else None
 localization_server = []
 
 # making a dummy request to close the current ccontrol-requests session
@@ -87,18 +92,17 @@ def get_next_action(last_action, new_actions, state, logger):
     
 
 last_action = None
-def get_control_action(s, logger,logger_states): #added paramater
+def get_control_action(arena, s, logger,logger_states): #added paramater
     global curr_target
     global target_vals
     global hrListTar
     global last_action
-    global localization_server
 
 
-    # prepare targets/obstacles
-    hrListTar = localization_server.get_hyper_rec_str("Target")  #retrieving target info from localization server
+    # prepare targets/obstacles from the arena snapshot of this tick
+    hrListTar = arena.get_hyper_rec_str("Target")  #retrieving target info from the snapshot
     target_str = stack_hrs(hrListTar) 
-    obstacles_str = stack_hrs(localization_server.get_hyper_rec_str("Obstacle"))  #retrieving obstacle info from localization server
+    obstacles_str = arena.stacked_hrs("Obstacle")  #retrieving obstacle info from the snapshot
     logger_states.log("Target coordinates: " + target_str) # added this
     logger_states.log("Obstacle coordinates: " + obstacles_str) # added this
 
@@ -117,17 +121,28 @@ def get_control_action(s, logger,logger_states): #added paramater
         curr_target += 1
         if curr_target == len(hrListTar):
             curr_target = 0
+        if planner is not None:
+            saved = planner.arrive(obstacles_str, hrListTar[curr_target][1])
+            logger.log("Synthesis time saved for target set #" + str(curr_target) + ": " + str(saved))
         return [True, "stop"]
 
     # synthsize a controller + get actions
     try:
         s_send = str(s).replace('[','(').replace(']',')')
-        u_psi_list = sym_control.synthesize_controller_get_actions(obstacles_str, target_str, s_send)
+        if planner is not None:
+            planner.cancel_stale(obstacles_str)
+            u_psi_list = sym_control.get_scene_actions(obstacles_str, target_str, s_send)
+        else:
+            u_psi_list = sym_control.synthesize_controller_get_actions(obstacles_str, target_str, s_send)
         
     except:
         logger.log("Controller synthesis / action collection failed.")
         return [True, "stop"]
 
+    # the controller for this target is ready: start on the next one's
+    if planner is not None:
+        planner.prefetch(obstacles_str, hrListTar[(curr_target + 1) % len(hrListTar)][1])
+
     # selecting one action
     actions_list = u_psi_list.replace(" ","").split('|')
     if len(actions_list) == 0:
@@ -139,6 +154,8 @@ def get_control_action(s, logger,logger_states): #added paramater
     return [True, action]
 
 def after_control_task(logger):
+    if planner is not None:
+        logger.log("Speculation stats: " + str(planner.get_stats()))
     return False
 
 # signal handler
@@ -148,7 +165,7 @@ def sig_handler(signal_received, frame):
 
 if __name__ == "__main__":
     signal(SIGINT, sig_handler)
-    dr_controller = DeepRacerController(tau, ROBOT_NAME, LOCALIZATION_SERVER_IPPORT, new_control_task, get_control_action, after_control_task)
+    dr_controller = DeepRacerController(tau, ROBOT_NAME, LOCALIZATION_SERVER_IPPORT, new_control_task, get_control_action, after_control_task, WarmUpURLs=[SYMCONTROL_SERVER_URI])
     dr_controller.spin()
 
     
@@ -4,7 +4,6 @@
 import time
 import math
 import gc
-import json
 import traceback
 from signal import signal, SIGINT
 from sys import exit
@@ -14,17 +13,11 @@ from sys import path
 path.insert(1, '../../src')
 
 import DeepRacer
-import httplib2
 from DeepRacerController import DeepRacerController
 from RemoteSymbolicController import RemoteSymbolicController
 from Logger import Logger
 from RESTApiClient import RESTApiClient
-
-# Print httplib2 version for debugging
-try:
-    print("Using httplib2 version: " + httplib2.__version__)
-except:
-    print("Could not determine httplib2 version")
+from RetryPolicy import RetryPolicy
 
 # Configuration
 STOP_AFTER_LAST_TARGET = False
@@ -50,65 +43,29 @@ last_action = None
 MAX_RETRIES = 3
 RETRY_DELAY = 1  # seconds
 
-# Create a custom RESTApiClient with better error handling and timeouts
+# RESTApiClient with the retry settings above and timing output. failed GETs are
+# retried by its RetryPolicy (jittered backoff); deadline (an absolute time.time())
+# bounds a request and its retries
 class RobustRESTApiClient(RESTApiClient):
     def __init__(self, url, timeout=10):
-        self.url = url
-        self.http = httplib2.Http(timeout=timeout)
+        RESTApiClient.__init__(self, url, connect_timeout=timeout, read_timeout=timeout,
+            retry_policy=RetryPolicy(max_attempts=MAX_RETRIES, base_delay=RETRY_DELAY, max_delay=RETRY_DELAY))
         print("Created RobustRESTApiClient with URL: " + url)
         
-    def restGETjson(self, query=""):
+    def restGETjson(self, query="", deadline=None):
         full_url = self.url + query
         print("Connecting to: " + full_url)
         start_time = time.time()
-        
-        for attempt in range(MAX_RETRIES):
-            try:
-                response, content = self.http.request(full_url, method="GET")
-                elapsed = time.time() - start_time
-                
-                if response.status != 200:
-                    print("HTTP Error: Status {0} after {1:.2f} seconds (attempt {2}/{3})".format(
-                        response.status, elapsed, attempt+1, MAX_RETRIES))
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                        continue
-                    else:
-                        raise Exception("HTTP Error: " + str(response.status))
-                
-                print("Response received in {0:.2f} seconds".format(elapsed))
-                
-                # Force garbage collection after network operation
-                gc.collect()
-                
-                # Parse JSON with error handling
-                try:
-                    if isinstance(content, bytes):
-                        content = content.decode('utf-8')
-                    return json.loads(content)
-                except ValueError as e:
-                    print("JSON parsing error: " + str(e))
-                    print("Response content: " + str(content)[:100] + "...")
-                    raise
-                    
-            except Exception as e:
-                elapsed = time.time() - start_time
-                print("Error after {0:.2f} seconds (attempt {1}/{2}): {3}".format(
-                    elapsed, attempt+1, MAX_RETRIES, str(e)))
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY)
-                else:
-                    raise
-        
-        raise Exception("Failed after " + str(MAX_RETRIES) + " attempts")
-    
-    def __del__(self):
-        """Explicit cleanup of HTTP resources"""
-        if hasattr(self, 'http'):
-            try:
-                self.http.clear()
-            except:
-                pass
+        try:
+            response = RESTApiClient.restGETjson(self, query, deadline)
+        except Exception as e:
+            print("Error after {0:.2f} seconds: {1}".format(time.time() - start_time, str(e)))
+            raise
+        print("Response received in {0:.2f} seconds".format(time.time() - start_time))
+
+        # Force garbage collection after network operation
+        gc.collect()
+        return response
 
 # Custom LocalizationServerInterface with better error handling
 class RobustLocalizationServerInterface:
@@ -1,7 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from .RESTApiClient import RESTApiClient
+import os
+import sys
+
+# the REST client is the one in src/ (with its retry policy and keep-alive transport),
+# found from this file so that any working directory works
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from RESTApiClient import RESTApiClient
 
 class LocalizationServerInterface:
     """Interface to the OptiTrack localization server, updated for Python 3.8"""
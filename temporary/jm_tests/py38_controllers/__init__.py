@@ -8,9 +8,10 @@ This package contains Python 3.8 compatible versions of the DeepRacer controller
 with improved networking using the requests library for better connection reliability.
 """
 
-from .RESTApiClient import RESTApiClient
+# the modules put src/ on the path for the shared REST client
 from .LocalizationServerInterface import LocalizationServerInterface
 from .RemoteSymbolicController import RemoteSymbolicController
+from RESTApiClient import RESTApiClient
 
 __all__ = [
     'RESTApiClient',
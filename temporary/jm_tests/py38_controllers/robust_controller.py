@@ -11,11 +11,11 @@ import math
 import socket
 import requests
 
-# Simple path setup - assumes running from deepracer-utils/examples/sym_control
-project_root = os.path.abspath(os.path.join(os.getcwd(), '../..'))
+# Path setup relative to this file, so it runs from any working directory
+py38_path = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(py38_path, '..', '..'))
 src_path = os.path.join(project_root, 'src')
 examples_path = os.path.join(project_root, 'examples')
-py38_path = os.path.join(project_root, 'py38_controllers')
 
 # Add all relevant paths to Python's module search path
 sys.path.insert(0, project_root)  # Project root
@@ -26,6 +26,7 @@ sys.path.insert(0, py38_path)     # Python 3.8 controllers
 # Import required modules
 from LocalizationServerInterface import LocalizationServerInterface
 from RESTApiClient import RESTApiClient
+from RetryPolicy import RETRYABLE_ERRORS, DeadlineExceeded
 
 # Constants
 THETA_MAX = 1.7  # Maximum theta value (normalized)
@@ -93,6 +94,14 @@ def normalize_theta(theta):
         
     return theta
 
+def get_hyper_rec_list(localization_server, item_type):
+    """Hyperrectangles of the given type, or an empty list if the localization server fails"""
+    try:
+        return localization_server.get_hyper_rec_str(item_type)
+    except RETRYABLE_ERRORS + (DeadlineExceeded, ValueError) as e:
+        print(f"Error getting {item_type} data: {str(e)}")
+        return []
+
 def get_next_action(actions_list, state, logger=None):
     """Function to get next action from the list of actions, using DeepRacer-Utils approach"""
     global last_action
@@ -231,7 +240,7 @@ def main():
                 try:
                     # Use a shorter timeout for OptiTrack to avoid long waits
                     # Create a custom RESTApiClient with a short timeout
-                    rest_client = RESTApiClient(optitrack_url, timeout=1)
+                    rest_client = RESTApiClient(optitrack_url, connect_timeout=1, read_timeout=1)
                     
                     print("Using shortened timeout (1 second) for faster response")
                     raw_data = rest_client.restGETjson()
@@ -283,7 +292,7 @@ def main():
                     localization_server = LocalizationServerInterface(optitrack_url)
                     
                     # Get target hyperrectangle
-                    target_data = localization_server.get_hyper_rec_str("Target")
+                    target_data = get_hyper_rec_list(localization_server, "Target")
                     if not target_data:
                         print("Error: No target data found")
                         print("Using hardcoded target")
@@ -294,7 +303,7 @@ def main():
                         print(f"Target hyperrectangle: {target_str}")
                     
                     # Get obstacle hyperrectangle
-                    obstacle_data = localization_server.get_hyper_rec_str("Obstacle")
+                    obstacle_data = get_hyper_rec_list(localization_server, "Obstacle")
                     if not obstacle_data:
                         print("Error: No obstacle data found")
                         print("Using hardcoded obstacle")
@@ -1,7 +1,17 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from .RESTApiClient import RESTApiClient
+import os
+import sys
+
+# the REST client is the one in src/ (with its retry policy and keep-alive transport),
+# found from this file so that any working directory works
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from RESTApiClient import RESTApiClient
+from RetryPolicy import RETRYABLE_ERRORS, DeadlineExceeded
 
 class RemoteSymbolicController:
     """Remote Symbolic Controller for DeepRacer, updated for Python 3.8
@@ -46,10 +56,14 @@ class RemoteSymbolicController:
         }
         
         # Send the request to the server
-        response = self.rest_client.restPUTjson(request)
+        try:
+            response = self.rest_client.restPUTjson(request)
+        except RETRYABLE_ERRORS + (DeadlineExceeded, ValueError) as e:
+            print(f"Control request failed: {e}")
+            return []
         
         # Extract actions from the response
-        if "actions" in response:
+        if response and "actions" in response:
             return response["actions"]
         else:
             return []
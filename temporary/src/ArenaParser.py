@@ -0,0 +1,94 @@
+import numpy as np
+from BodyClassifier import KIND_OTHER, KIND_TARGET, KIND_OBSTACLE, KIND_ROBOT, DEFAULT_THETA_V, DEFAULT_CLASSIFIER
+
+# one row per rigid body of an arena response, the name field as wide as the longest name
+# (one dtype per width, built once)
+def arena_dtype(name_size):
+    name_size = max(1, name_size)
+    if name_size not in _arena_dtypes:
+        _arena_dtypes[name_size] = make_arena_dtype(name_size)
+    return _arena_dtypes[name_size]
+
+_arena_dtypes = {}
+
+def make_arena_dtype(name_size):
+    return np.dtype([
+        ("name", "U%d" % name_size),
+        ("kind", "u1"),
+        ("t", "f8"),
+        ("x", "f8"),
+        ("y", "f8"),
+        ("theta", "f8"),
+        ("v", "f8"),
+        ("w", "f8"),
+        ("h", "f8"),
+        ("tracked", "?")
+    ])
+STATE_FIELDS = ["t", "x", "y", "theta", "v", "w", "h"]
+
+# theta/v bounds appended to the x/y bounds of every hyperrectangle
+THETA_V = DEFAULT_THETA_V
+
+# turn one arena response (a dict: name -> "t,x,y,theta,v,w,h" or "untracked") into a
+# structured array. the numbers of all tracked bodies are converted in a single call;
+# untracked bodies keep NaN states. a state without exactly one value per STATE_FIELDS
+# is malformed: the body is kept as untracked rather than letting its values shift
+# into the next body. the body kinds come from the classifier (by default the naming
+# rules of BodyClassifier.DEFAULT_RULES).
+def parse_arena(response, classifier=DEFAULT_CLASSIFIER):
+    names = list(response.keys())
+    fields = [None if value == "untracked" else value.split(",") for value in response.values()]
+    tracked = np.array([f is not None and len(f) == len(STATE_FIELDS) for f in fields], dtype=bool)
+
+    states = np.full((len(names), len(STATE_FIELDS)), np.nan)
+    if tracked.any():
+        numbers = [x for (f, ok) in zip(fields, tracked.tolist()) if ok for x in f]
+        states[tracked] = np.fromiter(map(float, numbers), dtype=np.float64, count=len(numbers)).reshape(-1, len(STATE_FIELDS))
+    return build_arena(names, states, tracked, classifier)
+
+# the structured array of bodies given their names, an (n, len(STATE_FIELDS)) array of
+# states and the tracked flags
+def build_arena(names, states, tracked, classifier=DEFAULT_CLASSIFIER):
+    arena = np.empty(len(names), dtype=arena_dtype(max([len(name) for name in names] or [0])))
+    arena["name"] = names
+    arena["kind"] = classifier.kinds(names)
+    for j, field in enumerate(STATE_FIELDS):
+        arena[field] = states[:, j]
+    arena["tracked"] = tracked
+
+    arena.flags.writeable = False
+    return arena
+
+# the state string ("t,x,y,theta,v,w,h") of one row of states, as the server sends it
+def format_state(values):
+    return ",".join([repr(float(value)) for value in values])
+
+# the state string of a body of the arena, "untracked" if it is untracked or missing
+def body_state(arena, name):
+    names = arena["name"].tolist()
+    if name not in names:
+        return "untracked"
+    # (name, kind, t, x, y, theta, v, w, h, tracked)
+    body = arena[names.index(name)].item()
+    if not body[-1]:
+        return "untracked"
+    return format_state(body[2:2 + len(STATE_FIELDS)])
+
+# the x/y bounding boxes of all bodies as an (n, 4) array: x_min, x_max, y_min, y_max
+def bounding_boxes(arena):
+    half_w = arena["w"]/2
+    half_h = arena["h"]/2
+    return np.column_stack((arena["x"] - half_w, arena["x"] + half_w, arena["y"] - half_h, arena["y"] + half_h))
+
+# the hyperrectangle strings of the tracked bodies of one kind, as (name, string) pairs
+def hyper_rec_strings(arena, kind, theta_v=THETA_V):
+    mask = arena["tracked"] & (arena["kind"] == kind)
+    if not mask.any():
+        return []
+
+    theta_v = theta_v[kind]
+    boxes = bounding_boxes(arena[mask]).tolist()
+    return_list = []
+    for name, box in zip(arena["name"][mask].tolist(), boxes):
+        return_list.append((name, "{%.4f,%.4f},{%.4f,%.4f}," % tuple(box) + theta_v))
+    return return_list
@@ -0,0 +1,125 @@
+import collections
+import ArenaParser
+from ArenaParser import KIND_TARGET, KIND_OBSTACLE
+
+KINDS = {"Target": KIND_TARGET, "Obstacle": KIND_OBSTACLE}
+
+
+# build the hyperrectangle strings of all tracked bodies of the given type
+# from one arena response (a dict: name -> "t,x,y,theta,v,w,h" or "untracked")
+def hyper_rec_list(response, item_type):
+    if item_type not in KINDS:
+        return []
+    return ArenaParser.hyper_rec_strings(ArenaParser.parse_arena(response), KINDS[item_type])
+
+
+# the server timestamp of a frame: the robot's own timestamp when it is tracked,
+# otherwise the newest timestamp among the tracked bodies (None if nothing is tracked)
+def frame_timestamp(response, robot_name):
+    robot_state = response.get(robot_name, "untracked")
+    if robot_state != "untracked":
+        return float(robot_state.split(',', 1)[0])
+
+    t = None
+    for value in response.values():
+        if value != "untracked":
+            t_body = float(value.split(',', 1)[0])
+            if t is None or t_body > t:
+                t = t_body
+    return t
+
+# the same for an arena array
+def arena_timestamp(arena, robot_name):
+    t = None
+    for (name, t_body, tracked) in zip(arena["name"].tolist(), arena["t"].tolist(), arena["tracked"].tolist()):
+        if not tracked:
+            continue
+        if name == robot_name:
+            return t_body
+        if t is None or t_body > t:
+            t = t_body
+    return t
+
+
+# an immutable view of the arena as returned by a single GET to the localization
+# server. it answers the same queries as LocalizationServerInterface, so callbacks
+# written against the server interface can be given a snapshot instead.
+# scene is the SceneView of a SceneCache, if the snapshot was taken through one.
+# bodies is None for a snapshot built from an arena array (from_arena): the state
+# strings are then only formatted when asked for.
+class ArenaSnapshot(collections.namedtuple("ArenaSnapshot", ["t", "robot_name", "robot_state", "bodies", "arena", "scene"])):
+    __slots__ = ()
+
+    @classmethod
+    def from_response(cls, response, robot_name, scene_cache=None):
+        if scene_cache is None:
+            arena = ArenaParser.parse_arena(response)
+        else:
+            arena = ArenaParser.parse_arena(response, scene_cache.classifier)
+        return cls(
+            t=frame_timestamp(response, robot_name),
+            robot_name=robot_name,
+            robot_state=response.get(robot_name, "untracked"),
+            bodies=tuple(sorted(response.items())),
+            arena=arena,
+            scene=None if scene_cache is None else scene_cache.update(arena)
+        )
+
+    # a snapshot of an arena already decoded into numbers (see ArenaParser.build_arena)
+    @classmethod
+    def from_arena(cls, arena, robot_name, scene_cache=None):
+        return cls(
+            t=arena_timestamp(arena, robot_name),
+            robot_name=robot_name,
+            robot_state=ArenaParser.body_state(arena, robot_name),
+            bodies=None,
+            arena=arena,
+            scene=None if scene_cache is None else scene_cache.update(arena)
+        )
+
+    # the hyperrectangle strings come from the scene cache, or are only formatted when asked for
+    @property
+    def targets(self):
+        if self.scene is not None:
+            return self.scene.targets
+        return tuple(ArenaParser.hyper_rec_strings(self.arena, KIND_TARGET))
+
+    @property
+    def obstacles(self):
+        if self.scene is not None:
+            return self.scene.obstacles
+        return tuple(ArenaParser.hyper_rec_strings(self.arena, KIND_OBSTACLE))
+
+    # changes whenever a target/obstacle moved by more than the cache's epsilon (None without a cache)
+    @property
+    def scene_generation(self):
+        if self.scene is None:
+            return None
+        return self.scene.generation
+
+    # the raw state string of any body in the snapshot ("untracked" if missing)
+    def getRigidBodyState(self, rbName):
+        if rbName == self.robot_name:
+            return self.robot_state
+        if self.bodies is None:
+            return ArenaParser.body_state(self.arena, rbName)
+        for name, value in self.bodies:
+            if name == rbName:
+                return value
+        return "untracked"
+
+    def get_hyper_rec_str(self, item_type):
+        if item_type == "Target":
+            return list(self.targets)
+        if item_type == "Obstacle":
+            return list(self.obstacles)
+        return []
+
+    # the hyperrectangles of one type joined with "|", as sent to the sym-control server
+    def stacked_hrs(self, item_type):
+        if self.scene is not None:
+            if item_type == "Target":
+                return self.scene.targets_str
+            if item_type == "Obstacle":
+                return self.scene.obstacles_str
+        return "|".join([hr for (name, hr) in self.get_hyper_rec_str(item_type)])
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from MotionControls import MotionControls
+from AsyncLocalizationServerInterface import AsyncLocalizationServerInterface
+from Logger import Logger
+from StoreRun_Logger import StoreRun_Logger
+from RetryPolicy import DeadlineExceeded
+
+# a loop whose state misses its deadline holds the last action at most this many times
+# in a row before the car is stopped (same bound as DeepRacerController)
+MAX_HELD_LOOPS = 3
+# a loop that took this many sample times stops the car (same bound as DeepRacerController)
+DEADLINE_FACTOR = 2.5
+
+# raised inside a loop to stop the car and leave spin()
+class StopControl(Exception):
+    pass
+
+async def _maybe_await(result):
+    if asyncio.iscoroutine(result):
+        return await result
+    return result
+
+
+# asyncio version of DeepRacerController (python 3 only). callbacks may be plain
+# functions or coroutines. the optional cb_prepare_control coroutine runs concurrently
+# with the state fetch of every loop (e.g. waiting for the sym-control server mode).
+# with tau>0.0 both have to finish within the loop's period, or they are cancelled and
+# the last action is held, as in DeepRacerController. the control action is never
+# cancelled: a pFaces exchange left halfway (no acknowledgment) would put the server
+# session out of step, so a late action is only noticed once it returns, and a loop
+# longer than DEADLINE_FACTOR*tau stops the car.
+class AsyncDeepRacerController():
+    def __init__(self, SampleTime, DeepRacerName, LocalizationServerIPPort, cb_new_control_task, cb_get_control_action, cb_after_control_task, cb_prepare_control=None):
+
+        # arena dimensions : measured using a single marker in Motive/Cameras
+        self.ARENA_UB = [2.129, 2.204]
+        self.ARENA_LB = [-2.166, -2.147]
+
+        # sensing and control objects
+        self.DeepRacerName = DeepRacerName
+        self.motion_control = MotionControls()
+        self.loc_server = AsyncLocalizationServerInterface("http://" + LocalizationServerIPPort + "/OptiTrackRestServer")
+
+        # a logger
+        self.logger = Logger()
+        self.logger_states = StoreRun_Logger()
+
+        # callbacks
+        self.new_control_task = cb_new_control_task
+        self.get_control_action = cb_get_control_action
+        self.after_control_task = cb_after_control_task
+        self.prepare_control = cb_prepare_control
+
+        # others
+        self.tau = SampleTime
+        self.last_action = None
+        self.held_loops = 0
+        self.loop_deadline = None
+        self.deadline_stats = {"state_deadline_exceeded": 0, "held": 0}
+
+    # get the arena (and prepare the control request) concurrently; with a deadline,
+    # both are cancelled once it passes (asyncio.TimeoutError or DeadlineExceeded)
+    async def fetch_state(self, deadline):
+        fetch = self.loc_server.snapshot(self.DeepRacerName, deadline)
+        if self.prepare_control is not None:
+            fetch = asyncio.gather(fetch, _maybe_await(self.prepare_control()))
+        if deadline is not None:
+            fetch = asyncio.wait_for(fetch, max(0.0, deadline - time.time()))
+        result = await fetch
+        return result if self.prepare_control is None else result[0]
+
+    # checks + control action of one motion-control loop, returns (last_controlloop, action)
+    async def control_step(self, snapshot):
+        # stop controls if..
+        s_str = snapshot.robot_state
+        if s_str == "untracked":
+            raise StopControl("Stopped due to an untracked state.")
+
+        # extract state of DR
+        s_split = s_str.split(',')
+        s = [float(s_split[1]), float(s_split[2]), float(s_split[3]), float(s_split[4])]
+        self.logger_states.log("Printing deepracer state: " + str(s))
+
+        # check if out of bounds
+        if s[0] > self.ARENA_UB[0] or s[0] < self.ARENA_LB[0]:
+            raise StopControl("Stopped due to an out of range state (X). s=" + str(s))
+        if s[1] > self.ARENA_UB[1] or s[1] < self.ARENA_LB[1]:
+            raise StopControl("Stopped due to an out of range state (Y). S = " + str(s))
+
+        try:
+            (last_controlloop, action) = await _maybe_await(self.get_control_action(snapshot, s, self.logger, self.logger_states))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            raise StopControl("Stopping due to error in getting control ations.")
+
+        # stop if no input is received
+        if action == None or action == "" or action == []:
+            raise StopControl("Stopped as we received no control action.")
+
+        return (last_controlloop, action)
+
+    async def spin(self):
+        # the high-level planning loop
+        planningloop_index = 0
+        while(True):
+
+            should_exit = await _maybe_await(self.new_control_task(self.loc_server, self.logger))
+            if should_exit:
+                break
+
+            # the motion-control loop
+            controlloop_index = 0
+            while(True):
+                loop_time_start = time.time()
+                self.loop_deadline = loop_time_start + self.tau if self.tau > 0.0 else None
+                try:
+                    snapshot = await self.fetch_state(self.loop_deadline)
+                except (asyncio.TimeoutError, DeadlineExceeded) as e:
+                    self.deadline_stats["state_deadline_exceeded"] += 1
+                    if not await self.hold_last_action("no state before the deadline (" + (str(e) or "timed out") + ")"):
+                        should_exit = True
+                        break
+                    continue
+                self.state_time_end = time.time()
+
+                try:
+                    (last_controlloop, action) = await self.control_step(snapshot)
+                except StopControl as e:
+                    self.motion_control.stop()
+                    self.logger.log(str(e))
+                    should_exit = True
+                    break
+                loop_time_end = time.time()
+                self.last_action = action
+                self.held_loops = 0
+
+                # move the car
+                if action == "stop":
+                    self.motion_control.stop()
+                else:
+                    self.motion_control.drive(action[0], action[1])
+
+                controlloop_index += 1
+                total_time = loop_time_end - loop_time_start
+                self.logger.log("Loop #" + str(planningloop_index) + "." + str(controlloop_index) + ": state_time=" + str(self.state_time_end - loop_time_start) + ", control_time=" + str(loop_time_end - self.state_time_end) + ", action=" + str(action))
+
+                if self.tau > 0.0:
+                    if total_time < self.tau:
+                        await asyncio.sleep(self.tau - total_time)
+                    elif total_time > DEADLINE_FACTOR*self.tau:
+                        self.motion_control.stop()
+                        self.logger.log("Stopped due excess violation of real-time deadline. Total time = " + str(total_time))
+                        should_exit = True
+                        break
+
+                if last_controlloop:
+                    break
+
+            if should_exit:
+                break
+
+            should_exit = await _maybe_await(self.after_control_task(self.logger))
+            if should_exit:
+                break
+
+            planningloop_index += 1
+
+        self.logger.log("Deadline stats: " + str(self.deadline_stats))
+        self.loc_server.close()
+
+    # keep driving with the last action for the rest of this loop; returns False (after
+    # stopping the car) if there is none or it was already held MAX_HELD_LOOPS times
+    async def hold_last_action(self, reason):
+        self.held_loops += 1
+        if self.last_action is None or self.last_action == "stop" or self.held_loops > MAX_HELD_LOOPS:
+            self.motion_control.stop()
+            self.logger.log("Stopped as there was " + reason + " and no action to hold.")
+            return False
+
+        self.deadline_stats["held"] += 1
+        self.motion_control.drive(self.last_action[0], self.last_action[1])
+        self.logger.log("Holding the last action " + str(self.last_action) + " as there was " + reason)
+        if self.loop_deadline is not None:
+            await asyncio.sleep(max(0.0, self.loop_deadline - time.time()))
+        return True
+
+    def __del__(self):
+        del self.motion_control
+        del self.loc_server
@@ -0,0 +1,28 @@
+from AsyncRESTApiClient import AsyncRESTApiClient
+from ArenaSnapshot import ArenaSnapshot
+from SceneCache import SceneCache, DEFAULT_EPSILON
+from BodyClassifier import DEFAULT_CLASSIFIER
+
+# asyncio version of LocalizationServerInterface (python 3 only)
+class AsyncLocalizationServerInterface():
+    def __init__(self, url, scene_epsilon=DEFAULT_EPSILON, classifier=DEFAULT_CLASSIFIER):
+        self.rest_client = AsyncRESTApiClient(url)
+        self.scene_cache = SceneCache(scene_epsilon, classifier)
+
+    # given the name of the rigid body, get its state (x,y,theta,v)
+    async def getRigidBodyState(self, rbName):
+        response = await self.rest_client.restGETjson("?RigidBody="+rbName)
+        return response[rbName]
+
+    async def get_hyper_rec_str(self, item_type):
+        response = await self.rest_client.restGETjson()
+        return ArenaSnapshot.from_response(response, None, self.scene_cache).get_hyper_rec_str(item_type)
+
+    # fetch the whole arena once and return it as an immutable ArenaSnapshot.
+    # deadline (an absolute time.time()) bounds the fetch, see AsyncRESTApiClient
+    async def snapshot(self, robot_name, deadline=None):
+        response = await self.rest_client.restGETjson("", deadline)
+        return ArenaSnapshot.from_response(response, robot_name, self.scene_cache)
+
+    def close(self):
+        self.rest_client.close()
@@ -0,0 +1,184 @@
+import asyncio
+import json
+from urllib.parse import urlsplit
+from RetryPolicy import RetryPolicy, ServerError, RETRYABLE_ERRORS
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_MAX_PER_HOST = 4
+# requests that may be sent twice: the server could have acted on the first one
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+# a connection closed half way through a response is worth retrying too
+ASYNC_RETRYABLE_ERRORS = RETRYABLE_ERRORS + (asyncio.IncompleteReadError,)
+
+
+# asyncio version of RESTApiClient (python 3 only). every request takes its own
+# keep-alive connection from a small per-host pool, so several requests can be in
+# flight at once. a request cancelled half way (e.g. at a tick deadline) closes its
+# connection instead of returning it to the pool. failed GETs are retried and a
+# deadline bounds a request as in RESTApiClient (with the same RetryPolicy), POSTs are
+# sent once.
+class AsyncRESTApiClient():
+    def __init__(self, url, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT, max_per_host=DEFAULT_MAX_PER_HOST, retry_policy=None):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_per_host = max_per_host
+        self.idle = {}
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self.retry_policy = retry_policy
+        self.post_policy = RetryPolicy(max_attempts=1)
+
+    # deadline (an absolute time.time()) bounds the request and its retries; past it
+    # RetryPolicy.DeadlineExceeded is raised
+    async def restGETjson(self, query = "", deadline=None):
+        async def attempt(timeout):
+            (status, data) = await self.request("GET", self.url + query, timeout=timeout)
+            if status >= 500:
+                raise ServerError("HTTP status " + str(status))
+            return json.loads(data.decode("utf-8"))
+        return await self.run(self.retry_policy, "GET " + self.url, attempt, deadline)
+
+    # returns the decoded JSON answer, None if the server sent none
+    async def restPUTjson(self, json_data, deadline=None):
+        body = json.dumps(json_data)
+        async def attempt(timeout):
+            (status, data) = await self.request(
+                "POST",
+                self.url,
+                headers={'Content-Type': 'application/json; charset=UTF-8'},
+                body=body,
+                timeout=timeout
+            )
+            if status >= 500:
+                raise ServerError("HTTP status " + str(status))
+            try:
+                return json.loads(data.decode("utf-8"))
+            except ValueError:
+                return None
+        return await self.run(self.post_policy, "POST " + self.url, attempt, deadline)
+
+    # RetryPolicy.run with asyncio sleeps and timeouts
+    async def run(self, policy, endpoint, attempt, deadline):
+        policy.count(endpoint, "requests")
+        for k in range(policy.max_attempts):
+            timeout = policy.attempt_timeout(endpoint, k, deadline)
+            try:
+                return await attempt(timeout)
+            except asyncio.TimeoutError as e:
+                error = policy.timeout_error(endpoint, e, deadline)
+                if error is not None:
+                    raise error
+                raise
+            except ASYNC_RETRYABLE_ERRORS:
+                if policy.last_attempt(endpoint, k):
+                    raise
+            await asyncio.sleep(policy.backoff(endpoint, k, deadline))
+
+    def get_stats(self):
+        stats = self.retry_policy.get_stats()
+        stats.update(self.post_policy.get_stats())
+        return {"retries": stats}
+
+    # timeout: the time left before the caller's deadline, caps both timeouts
+    async def request(self, method, url, body=None, headers=None, timeout=None):
+        parts = urlsplit(url)
+        # connections belong to the event loop that opened them
+        key = (asyncio.get_running_loop(), parts.hostname, parts.port or 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        payload = b"" if body is None else body.encode("utf-8")
+        lines = [method + " " + path + " HTTP/1.1", "Host: " + parts.netloc, "Content-Length: " + str(len(payload))]
+        for name, value in (headers or {}).items():
+            lines.append(name + ": " + value)
+        message = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+        conn = self._acquire(key)
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = await asyncio.wait_for(asyncio.open_connection(key[1], key[2]), self.timeout(self.connect_timeout, timeout))
+            (reader, writer) = conn
+            try:
+                writer.write(message)
+                await writer.drain()
+                (status, keep_alive, data) = await asyncio.wait_for(self._read_response(reader), self.timeout(self.read_timeout, timeout))
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # the idle connection went away under us: retry once on a fresh one
+                if reused and method in IDEMPOTENT_METHODS:
+                    reused = False
+                    conn = None
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive:
+                self._release(key, conn)
+            else:
+                writer.close()
+            return (status, data)
+
+    # a configured timeout cut to the time left before the deadline
+    def timeout(self, configured, left):
+        if left is None:
+            return configured
+        if configured is None:
+            return left
+        return min(configured, left)
+
+    def close(self):
+        for conns in self.idle.values():
+            for (reader, writer) in conns:
+                writer.close()
+        self.idle = {}
+
+    async def _read_response(self, reader):
+        status_line = await reader.readuntil(b"\r\n")
+        (version, status) = status_line.split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            (name, value) = line.decode("latin-1").split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == b"HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b"".join(chunks)
+        else:
+            data = await reader.read()
+            keep_alive = False
+        return (int(status), keep_alive, data)
+
+    def _acquire(self, key):
+        conns = self.idle.get(key)
+        while conns:
+            conn = conns.pop()
+            if not conn[0].at_eof():
+                return conn
+            conn[1].close()
+        return None
+
+    def _release(self, key, conn):
+        conns = self.idle.setdefault(key, [])
+        if len(conns) < self.max_per_host:
+            conns.append(conn)
+        else:
+            conn[1].close()
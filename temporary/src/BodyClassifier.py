@@ -0,0 +1,68 @@
+import collections
+import re
+import numpy as np
+
+# body kinds (roles)
+KIND_OTHER = 0
+KIND_TARGET = 1
+KIND_OBSTACLE = 2
+KIND_ROBOT = 3
+
+# bodies whose name matches pattern (a regular expression, searched anywhere in the
+# name) get the given kind. rules are tried in order and the first match wins; a name
+# matching none of them is KIND_OTHER (ignored).
+class NamingRule(collections.namedtuple("NamingRule", ["pattern", "kind"])):
+    __slots__ = ()
+
+DEFAULT_RULES = (
+    NamingRule("Target", KIND_TARGET),
+    NamingRule("Obstacle", KIND_OBSTACLE),
+    NamingRule("DeepRacer", KIND_ROBOT)
+)
+
+# theta/v bounds appended to the x/y bounds of every hyperrectangle
+DEFAULT_THETA_V = {
+    KIND_TARGET: "{-3.2,3.2},{0.0,0.8}",
+    KIND_OBSTACLE: "{-3.2,3.2},{-2.1,2.1}"
+}
+
+
+# maps the body names of an arena response to their kinds. the naming rules only run
+# once per name, and the kinds array of the last name list is kept, so as long as the
+# server returns the same bodies a response is classified with one tuple comparison.
+class BodyClassifier():
+    def __init__(self, rules=DEFAULT_RULES, theta_v=None):
+        self.rules = tuple([NamingRule(re.compile(pattern), kind) for (pattern, kind) in rules])
+        self.theta_v = dict(DEFAULT_THETA_V)
+        if theta_v is not None:
+            self.theta_v.update(theta_v)
+        self.known = {}     # name -> kind
+        self.index = ((), np.zeros(0, dtype=np.uint8))
+        self.rebuilds = 0
+
+    def kind(self, name):
+        kind = self.known.get(name)
+        if kind is None:
+            kind = KIND_OTHER
+            for rule in self.rules:
+                if rule.pattern.search(name):
+                    kind = rule.kind
+                    break
+            self.known[name] = kind
+        return kind
+
+    # the kinds of a list of names as a read-only uint8 array
+    def kinds(self, names):
+        names = tuple(names)
+        (index_names, index_kinds) = self.index
+        if names == index_names:
+            return index_kinds
+
+        index_kinds = np.array([self.kind(name) for name in names], dtype=np.uint8)
+        index_kinds.flags.writeable = False
+        self.index = (names, index_kinds)
+        self.rebuilds += 1
+        return index_kinds
+
+
+DEFAULT_CLASSIFIER = BodyClassifier()
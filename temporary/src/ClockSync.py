@@ -0,0 +1,89 @@
+import collections
+import threading
+import time
+import numpy as np
+
+DEFAULT_WINDOW = 64
+SAMPLE_INTERVAL = 0.5
+BEST_FRACTION = 0.5
+MIN_DRIFT_SPAN = 2.0
+
+# NTP-like estimate of the offset (server clock - local clock) and drift between the
+# media server and this machine, from the local send/receive times of requests and
+# the server timestamp of the frame they returned. every sample gives
+#     offset = t_server - (t_send + t_recv)/2     (+- rtt/2)
+# a frame that was already old when the request arrived only lowers a sample, so the
+# best samples are those with the largest lower bound t_server - t_recv (fresh frames,
+# short round trips). only the best sample of every `interval` seconds is kept, and the
+# estimate is a line offset(t) = offset + drift*(t - t_ref) through the best
+# best_fraction of the last `window` kept samples.
+class ClockSync():
+    def __init__(self, window=DEFAULT_WINDOW, interval=SAMPLE_INTERVAL, best_fraction=BEST_FRACTION):
+        self.samples = collections.deque(maxlen=window)    # (t_mid, offset, lower bound)
+        self.interval = interval
+        self.best_fraction = best_fraction
+        self.pending = None
+        self.estimate = None                                # (t_ref, offset, drift)
+        self.last_server_time = None
+        self.lock = threading.Lock()
+
+    def observe(self, send_time, recv_time, server_time):
+        if server_time is None:
+            return
+        t_mid = (send_time + recv_time)/2
+        sample = (t_mid, server_time - t_mid, server_time - recv_time)
+        with self.lock:
+            # repeated frames carry no new information
+            if server_time == self.last_server_time:
+                return
+            self.last_server_time = server_time
+
+            if self.pending is None or sample[2] > self.pending[2]:
+                self.pending = sample
+            if self.estimate is not None and t_mid - self.samples[-1][0] < self.interval:
+                return
+            self.samples.append(self.pending)
+            self.pending = None
+
+            samples = np.array(self.samples)
+            best = samples[np.argsort(samples[:, 2])[-max(1, int(len(samples)*self.best_fraction)):]]
+
+            t_ref = float(samples[-1, 0])
+            if len(best) >= 3 and best[:, 0].max() - best[:, 0].min() >= MIN_DRIFT_SPAN:
+                (drift, offset) = np.polyfit(best[:, 0] - t_ref, best[:, 1], 1)
+            else:
+                (drift, offset) = (0.0, float(np.median(best[:, 1])))
+            self.estimate = (t_ref, float(offset), float(drift))
+
+    # server clock - local clock at local time `now` (None before the first sample)
+    def offset(self, now=None):
+        estimate = self.estimate
+        if estimate is None:
+            return None
+        if now is None:
+            now = time.time()
+        (t_ref, offset, drift) = estimate
+        return offset + drift*(now - t_ref)
+
+    # the local time of a server timestamp
+    def local_time(self, server_time):
+        offset = self.offset()
+        if offset is None:
+            return None
+        return server_time - offset
+
+    # time since the frame with the given server timestamp was captured, in local seconds
+    def capture_age(self, server_time):
+        now = time.time()
+        offset = self.offset(now)
+        if offset is None or server_time is None:
+            return None
+        return now - (server_time - offset)
+
+    def get_stats(self):
+        estimate = self.estimate
+        return {
+            "samples": len(self.samples),
+            "offset": None if estimate is None else self.offset(),
+            "drift": None if estimate is None else estimate[2]
+        }
@@ -0,0 +1,118 @@
+import threading
+import time
+import HTTPTransport
+
+DEFAULT_WARM_UP_TIMEOUT = 180.0
+DEFAULT_PROBE_INTERVAL = 2.0
+DEFAULT_CONNECTIONS = 2
+
+# latency counters of one server
+class ProbeStats():
+    def __init__(self):
+        self.probes = 0
+        self.failures = 0
+        self.connects = 0
+        self.connect_time_last = None
+        self.connect_time_max = 0.0
+        self.ttfb_last = None
+        self.ttfb_total = 0.0
+        self.ttfb_max = 0.0
+        self.last_error = None
+
+    def add(self, timing):
+        self.probes += 1
+        if timing["connect_time"] is not None:
+            self.connects += 1
+            self.connect_time_last = timing["connect_time"]
+            self.connect_time_max = max(self.connect_time_max, timing["connect_time"])
+        self.ttfb_last = timing["ttfb"]
+        self.ttfb_total += timing["ttfb"]
+        self.ttfb_max = max(self.ttfb_max, timing["ttfb"])
+
+    def as_dict(self):
+        return {
+            "probes": self.probes,
+            "failures": self.failures,
+            "connects": self.connects,
+            "connect_time_last": self.connect_time_last,
+            "connect_time_max": self.connect_time_max,
+            "ttfb_last": self.ttfb_last,
+            "ttfb_avg": self.ttfb_total/max(self.probes - self.failures, 1),
+            "ttfb_max": self.ttfb_max,
+            "last_error": self.last_error
+        }
+
+
+# gets the connections to the servers (localization, pFaces, ...) ready before the
+# control loop starts, and keeps them ready afterwards.
+# warm_up() resolves every host and opens and validates (one GET each) `connections`
+# keep-alive connections per server, all servers in parallel, so the first control
+# tick does not pay for the (sometimes minutes long) first connection. the prober
+# thread started by start() sends a GET to every server that has been idle for
+# `interval` seconds (e.g. pFaces while the car drives), which keeps its pooled
+# connections open and measures connect time and time to first byte.
+class ConnectionWarmer():
+    def __init__(self, urls, transport=None, connections=DEFAULT_CONNECTIONS, interval=DEFAULT_PROBE_INTERVAL):
+        self.urls = list(urls)
+        if transport is None:
+            transport = HTTPTransport.default_transport()
+        self.transport = transport
+        self.connections = connections
+        self.interval = interval
+        self.stats = dict([(url, ProbeStats()) for url in self.urls])
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def probe(self, url, new_connection=False, connect_timeout=None, read_timeout=None):
+        stats = self.stats[url]
+        try:
+            stats.add(self.transport.probe(url, new_connection, connect_timeout, read_timeout))
+            return True
+        except Exception as e:
+            stats.probes += 1
+            stats.failures += 1
+            stats.last_error = repr(e)
+            return False
+
+    # warm up all servers in parallel; returns True if every server answered in time
+    def warm_up(self, timeout=DEFAULT_WARM_UP_TIMEOUT):
+        results = {}
+        def warm(url):
+            ok = True
+            for i in range(self.connections):
+                ok = self.probe(url, True, timeout, timeout) and ok
+            results[url] = ok
+
+        threads = [threading.Thread(target=warm, args=(url,), name="ConnectionWarmer") for url in self.urls]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        t_end = time.time() + timeout
+        for thread in threads:
+            thread.join(max(0.0, t_end - time.time()))
+        return all([results.get(url, False) for url in self.urls])
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="ConnectionProber")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def get_stats(self):
+        return dict([(url, stats.as_dict()) for url, stats in self.stats.items()])
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval/2):
+            for url in self.urls:
+                idle_time = self.transport.idle_time(url)
+                if idle_time is None or idle_time >= self.interval:
+                    self.probe(url)
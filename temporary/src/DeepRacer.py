@@ -22,12 +22,19 @@ def unmap_trottle(throttle_in):
     }
     return switcher.get(throttle_in, "Invalid input")
 
+# map a throttle accepted by the DeepRacer back to its input level (inverse of unmap_trottle)
+def map_trottle(throttle):
+    for throttle_in in range(-6, 7):
+        if unmap_trottle(throttle_in) == throttle:
+            return throttle_in
+    return 0
+
 # unmap the angle to the values accepted by the DeepRacer
 def unmap_angle(angle_in):
     return angle_in
 
 def deepracer_ode(x,u): 
-    dxdt = np.zeros((4,1)) # creates a 4x1 matrix of 0s
+    dxdt = np.zeros(4) # creates a vector of 4 0s (scalar entries keep the RK4 states scalar)
     u_steer = map_steering(u[0])
     u_speed = map_speed(u[1])
     L = 0.165
@@ -3,9 +3,21 @@ from MotionControls import MotionControls
 from LocalizationServerInterface import LocalizationServerInterface
 from Logger import Logger
 from StoreRun_Logger import StoreRun_Logger
+import StatePredictor
+from PollRateController import PollRateController, DEFAULT_MIN_RATE
+from ConnectionWarmer import ConnectionWarmer
+from RetryPolicy import DeadlineExceeded
+
+# how long spin() waits for the first polled localization frame
+FIRST_FRAME_TIMEOUT = 10.0
+# how long spin() waits for the servers to answer during the warm-up
+WARM_UP_TIMEOUT = 180.0
+# how many loops in a row may hold the last action when the state or the action
+# does not arrive within the loop's deadline, before the car is stopped
+MAX_HELD_LOOPS = 3
 
 class DeepRacerController():
-    def __init__(self, SampleTime, DeepRacerName, LocalizationServerIPPort, cb_new_control_task, cb_get_control_action, cb_after_control_task):
+    def __init__(self, SampleTime, DeepRacerName, LocalizationServerIPPort, cb_new_control_task, cb_get_control_action, cb_after_control_task, LocalizationPollRate=0.0, LocalizationPush=False, LatencyCompensation=False, LocalizationServer=None, StaleFramePolicy="act", FilterState=False, SceneRefreshPeriod=0.0, AdaptivePollRate=False, WarmUpURLs=None):
         
         # arena dimensions : measured using a single marker in Motive/Cameras
         self.ARENA_UB = [2.129, 2.204]
@@ -14,7 +26,10 @@ class DeepRacerController():
         # sensing and control objects
         self.DeepRacerName = DeepRacerName
         self.motion_control = MotionControls()
-        self.loc_server = LocalizationServerInterface("http://" + LocalizationServerIPPort + "/OptiTrackRestServer")
+        # LocalizationServer replaces the OptiTrack server at LocalizationServerIPPort (e.g. a replay)
+        if LocalizationServer is None:
+            LocalizationServer = LocalizationServerInterface("http://" + LocalizationServerIPPort + "/OptiTrackRestServer")
+        self.loc_server = LocalizationServer
 
         # a logger
         self.logger = Logger()
@@ -28,8 +43,76 @@ class DeepRacerController():
         # others
         self.tau = SampleTime
 
+        # FilterState=True hands the controller the alpha-beta filtered state (smoothed
+        # x, y, theta and velocity) instead of the raw OptiTrack one
+        self.filter_state = FilterState
+        if self.filter_state:
+            self.loc_server.start_filter()
+
+        # SceneRefreshPeriod>0.0 fetches only the DeepRacer every loop and the targets and
+        # obstacles every SceneRefreshPeriod seconds (or when the DeepRacer gets (un)tracked)
+        self.scene_period = SceneRefreshPeriod
+        self.loc_server.set_scene_period(self.scene_period)
+
+        # LocalizationPollRate=0.0 means the state is fetched at the start of every loop
+        # LocalizationPollRate>0.0 means a background poller fetches it at that rate (Hz)
+        # LocalizationPush=True subscribes to the server's push stream instead, polling
+        # at LocalizationPollRate only if push is unavailable
+        # AdaptivePollRate=True lets the poller go as low as DEFAULT_MIN_RATE when the
+        # DeepRacer is slow and far from obstacles (LocalizationPollRate being the max)
+        self.poll_rate = LocalizationPollRate
+        if self.poll_rate > 0.0:
+            if LocalizationPush:
+                self.loc_server.start_subscriber(self.DeepRacerName, self.poll_rate)
+            elif AdaptivePollRate:
+                rate_controller = PollRateController(min(DEFAULT_MIN_RATE, self.poll_rate), self.poll_rate)
+                self.loc_server.start_poller(self.DeepRacerName, self.poll_rate, rate_controller)
+            else:
+                self.loc_server.start_poller(self.DeepRacerName, self.poll_rate)
+
+        # WarmUpURLs (e.g. [pFaces url]): spin() first connects to the localization server
+        # and these servers in parallel, and a prober keeps the connections open while
+        # they are idle. None disables the warm-up.
+        self.warmer = None
+        if WarmUpURLs is not None:
+            urls = list(WarmUpURLs)
+            if self.loc_server.url.startswith("http"):
+                urls.insert(0, self.loc_server.url)
+            self.warmer = ConnectionWarmer(urls)
+
+        # LatencyCompensation=True sends the state predicted at the time the action is
+        # applied (measured state + last action integrated over the measured delay)
+        self.predictor = StatePredictor.StatePredictor() if LatencyCompensation else None
+        self.last_action = None
+
+        # what to do when the server returns a frame we already acted on (same timestamp):
+        # "act" on it anyway, "skip" the loop holding the last action, or "extrapolate"
+        # the state over the frame's age under the last action
+        self.stale_policy = StaleFramePolicy
+        self.frame_stats = {"loops": 0, "repeated": 0, "older_than_tau": 0, "skipped": 0, "extrapolated": 0}
+        # loops in a row on a repeated frame or one older than tau (with a poller, frames
+        # repeat between polls and may be one polling period older); past MAX_HELD_LOOPS
+        # the localization is taken as frozen and the car is stopped, whatever the policy
+        self.stale_loops = 0
+
+        # with tau>0.0, the state fetch has to finish within the loop's period (the
+        # deadline is in loop_deadline for the callbacks too); a loop that misses it
+        # holds the last action. RemoteSymbolicController does not take the deadline: a
+        # pFaces exchange (request, polls, acknowledgment) cannot be left halfway without
+        # putting the session out of step, so a late action is only noticed once the
+        # callback returns
+        self.loop_deadline = None
+        self.held_loops = 0
+        self.deadline_stats = {"state_deadline_exceeded": 0, "action_deadline_exceeded": 0, "held": 0}
+
 
     def spin(self):
+        if self.warmer is not None:
+            if not self.warmer.warm_up(WARM_UP_TIMEOUT):
+                self.logger.log("Warm-up: some servers did not answer.")
+            self.logger.log("Warm-up: " + str(self.warmer.get_stats()))
+            self.warmer.start()
+
         # the high-level planning loop
         planningloop_index = 0
         while(True):
@@ -42,9 +125,35 @@ class DeepRacerController():
             controlloop_index = 0
             while(True):
                 
-                # get the DR state (t, x, y, theta, v)
+                # get the arena in one fetch: DR state (t, x, y, theta, v), targets and obstacles
                 get_s_time_start = time.time()
-                s_str = self.loc_server.getRigidBodyState(self.DeepRacerName) 
+                self.loop_deadline = get_s_time_start + self.tau if self.tau > 0.0 else None
+                if self.poll_rate > 0.0:
+                    if not self.loc_server.poller.wait_first(FIRST_FRAME_TIMEOUT):
+                        self.motion_control.stop()
+                        self.logger.log("Stopped as the localization poller received no frame.")
+                        should_exit = True
+                        break
+                    # a polled frame older than the loop's period plus the polling period
+                    # means the poller is stalled or failing: hold the last action as when
+                    # a fetch misses its deadline
+                    (snapshot, poll_age) = self.loc_server.latest()
+                    if self.tau > 0.0 and poll_age > self.tau + self.loc_server.poller.period:
+                        self.deadline_stats["state_deadline_exceeded"] += 1
+                        if not self.hold_last_action("no polled state newer than the deadline (age=" + str(poll_age) + ")"):
+                            should_exit = True
+                            break
+                        continue
+                else:
+                    try:
+                        snapshot = self.loc_server.snapshot(self.DeepRacerName, self.loop_deadline)
+                    except DeadlineExceeded as e:
+                        self.deadline_stats["state_deadline_exceeded"] += 1
+                        if not self.hold_last_action("no state before the deadline (" + str(e) + ")"):
+                            should_exit = True
+                            break
+                        continue
+                s_str = snapshot.robot_state
                 get_s_time_end = time.time()
                 get_state_total_time = (get_s_time_end - get_s_time_start) 
 
@@ -59,7 +168,7 @@ class DeepRacerController():
                 s_split = s_str.split(',')
                 s = [float(s_split[1]), float(s_split[2]), float(s_split[3]), float(s_split[4])]
                 
-                self.logger_states.log("Printing deepracer state: " + s) #added this
+                self.logger_states.log("Printing deepracer state: " + str(s)) #added this
 
                 # check if out of bounds on x
                 if s[0] > self.ARENA_UB[0] or s[0] < self.ARENA_LB[0]:
@@ -75,9 +184,58 @@ class DeepRacerController():
                     should_exit = True
                     break
 
+                if self.filter_state:
+                    s_filtered = self.loc_server.filtered_state(self.DeepRacerName)
+                    if s_filtered is not None:
+                        s = s_filtered
+                        self.logger_states.log("Filtered deepracer state: " + str(s))
+
+                # is this a frame we already acted on ? how old is it ? (since it was captured
+                # once the server clock offset is known, otherwise since it was received)
+                frame = self.loc_server.read_frame(self.DeepRacerName)
+                state_age = frame.capture_age if frame.capture_age is not None else frame.age
+                self.frame_stats["loops"] += 1
+                older_than_tau = self.tau > 0.0 and state_age > self.tau
+                if older_than_tau:
+                    self.frame_stats["older_than_tau"] += 1
+                if self.poll_rate > 0.0:
+                    stale = self.tau > 0.0 and state_age > self.tau + self.loc_server.poller.period
+                else:
+                    stale = older_than_tau or not frame.is_new
+                if stale:
+                    self.stale_loops += 1
+                    if self.stale_loops > MAX_HELD_LOOPS:
+                        self.motion_control.stop()
+                        self.logger.log("Stopped as the localization frames were repeated or older than tau for " + str(self.stale_loops) + " loops in a row, t=" + str(frame.t) + ", age=" + str(state_age))
+                        should_exit = True
+                        break
+                else:
+                    self.stale_loops = 0
+                if not frame.is_new:
+                    self.frame_stats["repeated"] += 1
+                    if self.stale_policy == "skip" and self.last_action is not None:
+                        self.frame_stats["skipped"] += 1
+                        self.logger.log("Loop #" + str(planningloop_index) + "." + str(controlloop_index) + ": skipped a repeated frame, t=" + str(frame.t) + ", age=" + str(state_age))
+                        if self.tau > 0.0:
+                            time.sleep(max(0.0, self.tau - (time.time() - get_s_time_start)))
+                        continue
+                    if self.stale_policy == "extrapolate":
+                        self.frame_stats["extrapolated"] += 1
+                        s = StatePredictor.extrapolate(s, self.last_action, state_age)
+
+                if self.predictor is not None:
+                    s = self.predictor.predict(s, self.last_action)
+                    self.logger_states.log("Predicted deepracer state: " + str(s) + ", delay=" + str(self.predictor.delay_estimate()))
+
                 control_time_start = time.time()
                 try:
-                    (last_controlloop, action) = self.get_control_action(self.loc_server, s, self.logger, self.logger_states) #added parameter
+                    (last_controlloop, action) = self.get_control_action(snapshot, s, self.logger, self.logger_states) #added parameter
+                except DeadlineExceeded as e:
+                    self.deadline_stats["action_deadline_exceeded"] += 1
+                    if not self.hold_last_action("no action before the deadline (" + str(e) + ")"):
+                        should_exit = True
+                        break
+                    continue
                 except:
                     self.logger.log("Stopping due to error in getting control ations.")
                     self.motion_control.stop()
@@ -98,13 +256,22 @@ class DeepRacerController():
                     self.motion_control.stop()
                 else:
                     self.motion_control.drive(action[0], action[1])
+                self.last_action = action
+                self.held_loops = 0
 
                 # for logging every loop: time, in, out, action, loop index
                 controlloop_index += 1
                 total_time = control_total_time + get_state_total_time
+                # measurement-to-actuation delay
+                if frame.capture_age is not None:
+                    delay = state_age + control_total_time
+                else:
+                    delay = state_age + total_time
+                if self.predictor is not None:
+                    self.predictor.observe_delay(delay)
 
                 # writing information to log files
-                self.logger.log("Loop #" + str(planningloop_index) + "." + str(controlloop_index) + ": state_time=" + str(get_state_total_time) + ", control_time=" + str(control_total_time) + ", action=" + str(action))
+                self.logger.log("Loop #" + str(planningloop_index) + "." + str(controlloop_index) + ": state_time=" + str(get_state_total_time) + ", state_age=" + str(state_age) + ", control_time=" + str(control_total_time) + ", delay=" + str(delay) + ", action=" + str(action))
 
                 # tau=0.0 means no realtime window enformement/check
                 # tau>0.0 means realtime window will be enforced/checked
@@ -131,8 +298,37 @@ class DeepRacerController():
             
             controlloop_index += 1
 
+        self.logger.log("Frame stats: " + str(self.frame_stats))
+        self.logger.log("Deadline stats: " + str(self.deadline_stats))
+        if hasattr(self.loc_server.rest_client, "get_stats"):
+            self.logger.log("Localization REST stats: " + str(self.loc_server.rest_client.get_stats()))
+        self.logger.log("Server clock: " + str(self.loc_server.clock_stats()))
+        if self.scene_period > 0.0:
+            self.logger.log("Dual-rate localization stats: " + str(self.loc_server.scene_stats()))
+        if self.poll_rate > 0.0:
+            self.logger.log("Localization poller stats: " + str(self.loc_server.poller_stats()))
+        if self.warmer is not None:
+            self.warmer.stop()
+            self.logger.log("Connection stats: " + str(self.warmer.get_stats()))
+
+
+    # keep driving with the last action for the rest of this loop; returns False (after
+    # stopping the car) if there is none or it was already held MAX_HELD_LOOPS times
+    def hold_last_action(self, reason):
+        self.held_loops += 1
+        if self.last_action is None or self.last_action == "stop" or self.held_loops > MAX_HELD_LOOPS:
+            self.motion_control.stop()
+            self.logger.log("Stopped as there was " + reason + " and no action to hold.")
+            return False
 
+        self.deadline_stats["held"] += 1
+        self.motion_control.drive(self.last_action[0], self.last_action[1])
+        self.logger.log("Holding the last action " + str(self.last_action) + " as there was " + reason)
+        if self.loop_deadline is not None:
+            time.sleep(max(0.0, self.loop_deadline - time.time()))
+        return True
 
     def __del__(self):
+        self.loc_server.stop_poller()
         del self.motion_control
         del self.loc_server
@@ -0,0 +1,86 @@
+import os
+import threading
+import numpy as np
+import ArenaParser
+
+NAME_SIZE = 32
+
+# one fixed-size little-endian record per rigid body per received arena frame. a
+# recording is a plain concatenation of records (no header), so it can be opened with
+# np.memmap(path, dtype=RECORD_DTYPE, mode="r") while it is still being written.
+RECORD_DTYPE = np.dtype([
+    ("frame", "<u4"),
+    ("recv_time", "<f8"),
+    ("name", "S%d" % NAME_SIZE),
+    ("t", "<f8"),
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("theta", "<f8"),
+    ("v", "<f8"),
+    ("w", "<f8"),
+    ("h", "<f8"),
+    ("tracked", "?")
+])
+
+# appends every arena frame it is given to a binary recording. a body whose name does
+# not fit the NAME_SIZE bytes (utf-8) of a record is left out of the recording and
+# counted in skipped_bodies, the rest of its frame is recorded.
+class FrameRecorder():
+    def __init__(self, path):
+        self.path = path
+        (records, starts) = load_recording(path)
+        self.frames = int(records["frame"][-1]) + 1 if len(records) > 0 else 0
+        self.file = open(path, "ab")
+        self.lock = threading.Lock()
+        self.skipped_bodies = 0
+
+    def record(self, arena, recv_time):
+        names = [name.encode("utf-8") for name in arena["name"].tolist()]
+        fits = np.array([len(name) <= NAME_SIZE for name in names], dtype=bool)
+        if not fits.all():
+            self.skipped_bodies += int(len(names) - fits.sum())
+            arena = arena[fits]
+            names = [name for (name, ok) in zip(names, fits.tolist()) if ok]
+
+        records = np.zeros(len(arena), dtype=RECORD_DTYPE)
+        records["recv_time"] = recv_time
+        records["name"] = names
+        for field in ArenaParser.STATE_FIELDS:
+            records[field] = arena[field]
+        records["tracked"] = arena["tracked"]
+
+        with self.lock:
+            records["frame"] = self.frames
+            self.file.write(records.tobytes())
+            self.file.flush()
+            self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+    def __del__(self):
+        self.file.close()
+
+
+# memory-map a recording and split it into frames: returns (records, starts) where
+# frame i is records[starts[i]:starts[i+1]]
+def load_recording(path):
+    count = os.path.getsize(path)//RECORD_DTYPE.itemsize if os.path.exists(path) else 0
+    if count == 0:
+        return (np.zeros(0, dtype=RECORD_DTYPE), np.zeros(1, dtype=np.intp))
+    # a record being written right now is left out
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+    starts = np.flatnonzero(np.diff(records["frame"])) + 1
+    return (records, np.concatenate(([0], starts, [len(records)])))
+
+# the arena dictionary (as returned by the localization server) of a frame's records
+def frame_response(records):
+    response = {}
+    names = [name.decode("utf-8") for name in records["name"].tolist()]
+    states = np.column_stack([records[field] for field in ArenaParser.STATE_FIELDS]).tolist()
+    for name, state, tracked in zip(names, states, records["tracked"].tolist()):
+        if tracked:
+            response[name] = ",".join([repr(float(value)) for value in state])
+        else:
+            response[name] = "untracked"
+    return response
@@ -0,0 +1,42 @@
+import collections
+import threading
+import time
+
+# what a reader learns about the latest frame of a body
+# (capture_age is filled in by LocalizationServerInterface.read_frame, see ClockSync)
+class FrameInfo(collections.namedtuple("FrameInfo", ["t", "age", "is_new", "capture_age"])):
+    __slots__ = ()
+
+
+# tracks the server timestamp (the first field of "t,x,y,theta,v,w,h") of every body.
+# a frame's age is measured from the moment its timestamp was first received, so a
+# frame the server keeps returning ages even though every fetch is fresh. is_new tells
+# whether the timestamp changed since the previous read of the same body.
+class FrameTracker():
+    def __init__(self):
+        self.frames = {}    # name -> [t, first_recv_time, t_at_last_read]
+        self.lock = threading.Lock()
+
+    def update(self, arena, recv_time):
+        tracked = arena["tracked"]
+        names = arena["name"][tracked].tolist()
+        stamps = arena["t"][tracked].tolist()
+        with self.lock:
+            for name, t in zip(names, stamps):
+                frame = self.frames.get(name)
+                if frame is None:
+                    self.frames[name] = [t, recv_time, None]
+                elif frame[0] != t:
+                    frame[0] = t
+                    frame[1] = recv_time
+
+    # FrameInfo of the newest frame of a body (None if it was never tracked); marks it as read
+    def read(self, name):
+        now = time.time()
+        with self.lock:
+            frame = self.frames.get(name)
+            if frame is None:
+                return None
+            is_new = frame[0] != frame[2]
+            frame[2] = frame[0]
+            return FrameInfo(frame[0], now - frame[1], is_new, None)
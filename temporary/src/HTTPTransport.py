@@ -0,0 +1,163 @@
+import socket
+import threading
+import time
+
+# python 2.7 (robot image) and python 3 (py38 controllers) module names
+try:
+    import httplib as http_client
+    from urlparse import urlsplit
+except ImportError:
+    import http.client as http_client
+    from urllib.parse import urlsplit
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_MAX_PER_HOST = 4
+
+# errors meaning a reused keep-alive connection was closed by the server while idle
+_STALE_CONNECTION_ERRORS = (http_client.BadStatusLine, socket.error)
+# requests that may be sent twice: the server could have acted on the first one
+_IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+
+
+# a pool of persistent HTTP/1.1 connections, at most max_per_host idle ones per host.
+# a connection is taken out of the pool for the duration of one request, so the pool
+# can be shared by several clients and threads.
+class HTTPTransport():
+    def __init__(self, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT, max_per_host=DEFAULT_MAX_PER_HOST):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_per_host = max_per_host
+        self.idle = {}
+        self.lock = threading.Lock()
+        # resolved (host, port) -> socket address, and when each host was last used
+        self.addresses = {}
+        self.last_used = {}
+
+    # send one request and return (status, body); timeouts default to the transport's
+    def request(self, method, url, body=None, headers=None, connect_timeout=None, read_timeout=None):
+        return self._request(method, url, body, headers, connect_timeout, read_timeout)[:2]
+
+    # GET url and time it: returns {"connect_time": seconds to resolve and connect, or
+    # None if an idle connection was reused, "ttfb": seconds from sending the request to
+    # the response headers, "status": HTTP status}. with new_connection=True a fresh
+    # connection is opened and, if the pool has room, kept for the next requests.
+    def probe(self, url, new_connection=False, connect_timeout=None, read_timeout=None):
+        (status, data, timing) = self._request("GET", url, None, None, connect_timeout, read_timeout, new_connection)
+        timing["status"] = status
+        return timing
+
+    # the socket address of a host, resolved once
+    def resolve(self, host, port):
+        address = self.addresses.get((host, port))
+        if address is None:
+            address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4]
+            self.addresses[(host, port)] = address
+        return address
+
+    # seconds since a request last went to the host of url (None if never)
+    def idle_time(self, url):
+        parts = urlsplit(url)
+        last_used = self.last_used.get((parts.scheme, parts.hostname, parts.port))
+        if last_used is None:
+            return None
+        return time.time() - last_used
+
+    def _request(self, method, url, body, headers, connect_timeout, read_timeout, new_connection=False):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        if connect_timeout is None:
+            connect_timeout = self.connect_timeout
+        if read_timeout is None:
+            read_timeout = self.read_timeout
+        self.last_used[key] = time.time()
+
+        conn = None if new_connection else self._acquire(key)
+        reused = conn is not None
+        timing = {"connect_time": None}
+        while True:
+            if conn is None:
+                connect_start = time.time()
+                conn = self._connect(key, connect_timeout)
+                timing["connect_time"] = time.time() - connect_start
+            conn.sock.settimeout(read_timeout)
+            request_start = time.time()
+            try:
+                conn.request(method, path, body, headers or {})
+                response = conn.getresponse()
+                timing["ttfb"] = time.time() - request_start
+                data = response.read()
+            except socket.timeout:
+                conn.close()
+                raise
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                # the idle connection went away under us: retry once on a fresh one
+                if reused and method in _IDEMPOTENT_METHODS:
+                    reused = False
+                    conn = None
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return (response.status, data, timing)
+
+    def close(self):
+        with self.lock:
+            idle = self.idle
+            self.idle = {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _connect(self, key, connect_timeout):
+        (scheme, host, port) = key
+        if scheme == "https":
+            conn = http_client.HTTPSConnection(host, port, timeout=connect_timeout)
+            conn.connect()
+        else:
+            # connect to the cached address (the Host header keeps the name)
+            conn = http_client.HTTPConnection(host, port, timeout=connect_timeout)
+            try:
+                conn.sock = socket.create_connection(self.resolve(host, port or 80)[:2], connect_timeout)
+            except socket.error:
+                self.addresses.pop((host, port or 80), None)
+                raise
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def _acquire(self, key):
+        with self.lock:
+            conns = self.idle.get(key)
+            if conns:
+                return conns.pop()
+        return None
+
+    def _release(self, key, conn):
+        with self.lock:
+            conns = self.idle.setdefault(key, [])
+            if len(conns) < self.max_per_host:
+                conns.append(conn)
+                return
+        conn.close()
+
+
+# the transport shared by every RESTApiClient that is not given its own
+_default_transport = None
+_default_lock = threading.Lock()
+
+def default_transport():
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HTTPTransport()
+        return _default_transport
@@ -0,0 +1,116 @@
+import threading
+import time
+
+# fetches arena snapshots in a background thread at a fixed rate and publishes the
+# newest one into a double-buffered latest-value slot. the writer fills the back
+# slot and then flips the front index; both are single reference assignments, so
+# readers never take a lock and always see a complete (seq, recv_time, snapshot).
+# with a rate_controller (see PollRateController) the rate is re-chosen after every
+# fetched snapshot.
+class LocalizationPoller():
+    def __init__(self, fetch, rate, rate_controller=None):
+        self.fetch = fetch
+        self.period = 1.0/rate
+        self.rate_controller = rate_controller
+
+        self.slots = [None, None]
+        self.front = 0
+        self.seq = 0
+        self.last_read_seq = 0
+
+        # counters
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.fetch_time_last = 0.0
+        self.fetch_time_total = 0.0
+        self.fetch_time_max = 0.0
+        self.frames_dropped = 0
+        self.frames_reused = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="LocalizationPoller")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    # the newest frame and its age in seconds: (snapshot, age), or (None, None)
+    # if nothing was fetched yet
+    def latest(self):
+        frame = self.slots[self.front]
+        if frame is None:
+            return (None, None)
+
+        (seq, recv_time, snapshot) = frame
+        if seq == self.last_read_seq:
+            self.frames_reused += 1
+        else:
+            self.frames_dropped += seq - self.last_read_seq - 1
+            self.last_read_seq = seq
+        return (snapshot, time.time() - recv_time)
+
+    # block until a first frame is available (or the timeout expires)
+    def wait_first(self, timeout=None):
+        t_end = None if timeout is None else time.time() + timeout
+        while self.slots[self.front] is None:
+            if t_end is not None and time.time() > t_end:
+                return False
+            time.sleep(min(self.period, 0.01))
+        return True
+
+    def get_stats(self):
+        fetches = max(self.fetches, 1)
+        stats = {
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "fetch_time_last": self.fetch_time_last,
+            "fetch_time_avg": self.fetch_time_total/fetches,
+            "fetch_time_max": self.fetch_time_max,
+            "frames_dropped": self.frames_dropped,
+            "frames_reused": self.frames_reused
+        }
+        if self.rate_controller is not None:
+            stats.update(self.rate_controller.get_stats())
+        return stats
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            fetch_start = time.time()
+            try:
+                snapshot = self.fetch()
+            except Exception:
+                self.fetch_errors += 1
+                snapshot = None
+            fetch_end = time.time()
+
+            if snapshot is not None:
+                self._publish(snapshot, fetch_end, fetch_end - fetch_start)
+                if self.rate_controller is not None:
+                    self.period = 1.0/self.rate_controller.update(snapshot, fetch_end - fetch_start)
+
+            remaining = self.period - (time.time() - fetch_start)
+            if remaining > 0.0:
+                self.stop_event.wait(remaining)
+
+    def _publish(self, snapshot, recv_time, fetch_time):
+        self.fetches += 1
+        self.fetch_time_last = fetch_time
+        self.fetch_time_total += fetch_time
+        self.fetch_time_max = max(self.fetch_time_max, fetch_time)
+
+        # fill the back slot, then flip
+        back = 1 - self.front
+        self.seq += 1
+        self.slots[back] = (self.seq, recv_time, snapshot)
+        self.front = back
@@ -1,8 +1,41 @@
+import time
 import RESTApiClient
+from ArenaSnapshot import ArenaSnapshot
+from LocalizationPoller import LocalizationPoller
+from LocalizationSubscriber import LocalizationSubscriber
+from SceneCache import SceneCache, DEFAULT_EPSILON
+from BodyClassifier import DEFAULT_CLASSIFIER
+from FrameRecorder import FrameRecorder
+from FrameTracker import FrameTracker
+from ClockSync import ClockSync
+from PoseFilter import PoseFilter, DEFAULT_ALPHA, DEFAULT_BETA
 
 class LocalizationServerInterface():
-    def __init__(self, url):
-        self.rest_client = RESTApiClient.RESTApiClient(url)
+    # classifier: a BodyClassifier holding the naming rules that assign the body roles
+    # False for sources whose frame timestamps are not read from the server's clock
+    # (replays, local caches, streams): ClockSync is then not fed and capture_age stays None
+    has_server_clock = True
+
+    # freshness: seconds for which an arena response is shared instead of fetched again
+    def __init__(self, url, scene_epsilon=DEFAULT_EPSILON, classifier=DEFAULT_CLASSIFIER, freshness=0.0):
+        self.url = url
+        self.rest_client = RESTApiClient.RESTApiClient(url, freshness=freshness)
+        self.poller = None
+        # targets/obstacles hyperrectangles, re-formatted only when they move
+        self.scene_cache = SceneCache(scene_epsilon, classifier)
+        self.recorder = None
+        # server timestamp of every body, to detect repeated and old frames
+        self.frame_tracker = FrameTracker()
+        # server clock offset and drift, to tell how long ago a frame was captured
+        self.clock_sync = ClockSync()
+        self.pose_filter = None
+        # dual-rate mode (see set_scene_period): the last full arena response
+        self.scene_period = 0.0
+        self.scene_response = None
+        self.scene_time = 0.0
+        self.robot_fetches = 0
+        self.scene_refreshes = 0
+        self.forced_refreshes = 0
 
     # given the name of the rigid body, get its state (x,y,theta,v)
     def getRigidBodyState(self, rbName):
@@ -10,42 +43,124 @@ class LocalizationServerInterface():
         return response[rbName]
 
     def get_hyper_rec_str(self, item_type):
-
         response = self.rest_client.restGETjson()
-        return_list = []
-
-        # item[0] = name, item[1] = "untracked" or will be list of values
-        for item in response.items():
-            is_passed = False
-            if item[1] != "untracked":
-
-                values = item[1].split(',')
-                x = values[1]
-                y = values[2]
-                width = values[5]
-                width = float(width)
-                height = values[6]
-                height = float(height)
-
-                if "Target" in item[0] and "Target" == item_type: # is a target
-                    x_1 = "{:.4f}".format(float(x) - width/2)
-                    x_2 = "{:.4f}".format(float(x) + width/2)
-                    y_1 = "{:.4f}".format(float(y) - height/2)
-                    y_2 = "{:.4f}".format(float(y) + height/2)
-                    theta_v = "{-3.2,3.2},{0.0,0.8}"
-
-                elif "Obstacle" in item[0] and "Obstacle" == item_type: # is an obstacle
-                    x_1 = "{:.4f}".format(float(x) - width/2)
-                    x_2 = "{:.4f}".format(float(x) + width/2)
-                    y_1 = "{:.4f}".format(float(y) - height/2)
-                    y_2 = "{:.4f}".format(float(y) + height/2)
-                    theta_v = "{-3.2,3.2},{-2.1,2.1}"
-
-                else:
-                    is_passed = True
-                    pass
-                if (is_passed == False):
-                    return_string = "{" + str(x_1) + "," + str(x_2) + "},{" + str(y_1) + "," + str(y_2) + "}," + theta_v
-                    return_list.append((item[0], return_string))
-                    
-        return return_list  
+        return self.make_snapshot(response, None).get_hyper_rec_str(item_type)
+
+    # fetch the whole arena once and return it as an immutable ArenaSnapshot
+    # holding the robot state, the target/obstacle hyperrectangles and the server time.
+    # deadline (an absolute time.time()) bounds the fetch, see RESTApiClient
+    def snapshot(self, robot_name, deadline=None):
+        send_time = time.time()
+        if self.scene_period > 0.0 and robot_name is not None:
+            return self.make_snapshot(self.dual_rate_response(robot_name, deadline), robot_name, send_time)
+        response = self.rest_client.restGETjson("", deadline)
+        return self.make_snapshot(response, robot_name, send_time)
+
+    # dual-rate mode: with period>0.0, snapshot() only fetches the robot ("?RigidBody=")
+    # and completes it with the targets/obstacles of the last full arena, which is
+    # fetched again every period seconds, or right away if the robot got (un)tracked.
+    # period=0.0 fetches the full arena every time.
+    def set_scene_period(self, period):
+        self.scene_period = period
+        self.scene_response = None
+
+    def dual_rate_response(self, robot_name, deadline=None):
+        if self.scene_response is not None and time.time() - self.scene_time < self.scene_period:
+            robot = self.rest_client.restGETjson("?RigidBody="+robot_name, deadline)
+            self.robot_fetches += 1
+            state = robot.get(robot_name, "untracked")
+            was_tracked = self.scene_response.get(robot_name, "untracked") != "untracked"
+            if (state != "untracked") == was_tracked:
+                response = dict(self.scene_response)
+                response[robot_name] = state
+                return response
+            self.forced_refreshes += 1
+
+        response = self.rest_client.restGETjson("", deadline)
+        self.scene_response = response
+        self.scene_time = time.time()
+        self.scene_refreshes += 1
+        return response
+
+    def scene_stats(self):
+        return {"robot_fetches": self.robot_fetches, "scene_refreshes": self.scene_refreshes, "forced_refreshes": self.forced_refreshes}
+
+    # send_time: when the request for the response was sent (None for pushed frames)
+    def make_snapshot(self, response, robot_name, send_time=None):
+        recv_time = time.time()
+        return self.observe(ArenaSnapshot.from_response(response, robot_name, self.scene_cache), send_time, recv_time)
+
+    # feed a new snapshot to the clock sync, the frame tracker, the pose filter and the recorder
+    def observe(self, snapshot, send_time, recv_time):
+        if send_time is not None and self.has_server_clock:
+            self.clock_sync.observe(send_time, recv_time, snapshot.t)
+        self.frame_tracker.update(snapshot.arena, recv_time)
+        if self.pose_filter is not None:
+            self.pose_filter.update(snapshot.arena)
+        if self.recorder is not None:
+            self.recorder.record(snapshot.arena, recv_time)
+        return snapshot
+
+    # FrameInfo(t, age, is_new, capture_age) of the newest frame received for a body:
+    # the server timestamp, the time since it was first received, whether it changed
+    # since the last read_frame of that body, and the time since it was captured (on
+    # the local clock, None until the clock offset is known or without a server clock)
+    def read_frame(self, rbName):
+        frame = self.frame_tracker.read(rbName)
+        if frame is None:
+            return None
+        return frame._replace(capture_age=self.clock_sync.capture_age(frame.t))
+
+    def clock_stats(self):
+        return self.clock_sync.get_stats()
+
+    # smooth the poses of all bodies with an alpha-beta filter (see PoseFilter) fed with
+    # every frame received from now on
+    def start_filter(self, alpha=DEFAULT_ALPHA, beta=DEFAULT_BETA):
+        self.pose_filter = PoseFilter(alpha, beta)
+
+    def stop_filter(self):
+        self.pose_filter = None
+
+    # the filtered state (x,y,theta,v) of a rigid body as a list of floats, None if the
+    # filter is off or has not seen the body yet
+    def filtered_state(self, rbName):
+        if self.pose_filter is None:
+            return None
+        return self.pose_filter.state(rbName)
+
+    # append every arena frame received from now on to a binary recording (see FrameRecorder)
+    def start_recording(self, path):
+        self.recorder = FrameRecorder(path)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    # optional background poller: fetch snapshots continuously at the given rate (Hz),
+    # or at the rate picked by a PollRateController
+    def start_poller(self, robot_name, rate, rate_controller=None):
+        if self.poller is None:
+            self.poller = LocalizationPoller(lambda: self.snapshot(robot_name), rate, rate_controller)
+        self.poller.start()
+
+    # optional push mode: subscribe to the server's event stream (url + "/stream" by
+    # default) and fall back to polling at fallback_rate (Hz) if it is unavailable
+    def start_subscriber(self, robot_name, fallback_rate, stream_url=None):
+        if stream_url is None:
+            stream_url = self.url + "/stream"
+        if self.poller is None:
+            self.poller = LocalizationSubscriber(stream_url, lambda response: self.make_snapshot(response, robot_name), lambda: self.snapshot(robot_name), fallback_rate)
+        self.poller.start()
+
+    def stop_poller(self):
+        if self.poller is not None:
+            self.poller.stop()
+
+    # newest polled (or pushed) snapshot and its age in seconds, (None, None) before the first frame
+    def latest(self):
+        return self.poller.latest()
+
+    def poller_stats(self):
+        return self.poller.get_stats()
@@ -0,0 +1,78 @@
+import json
+import time
+from LocalizationPoller import LocalizationPoller
+
+# python 2.7 (robot image) and python 3 (py38 controllers) module names
+try:
+    import httplib as http_client
+    from urlparse import urlsplit
+except ImportError:
+    import http.client as http_client
+    from urllib.parse import urlsplit
+
+DEFAULT_CONNECT_TIMEOUT = 2.0
+DEFAULT_READ_TIMEOUT = 1.0
+
+
+# push-based version of LocalizationPoller: subscribes to a server-sent events stream
+# where every event's data is one arena JSON dictionary (the same format as the REST
+# response) and publishes each event, turned into a snapshot by make_snapshot, as it
+# arrives. if the stream cannot be opened or stays silent for read_timeout, it falls
+# back to REST polling at fallback_rate.
+class LocalizationSubscriber(LocalizationPoller):
+    def __init__(self, stream_url, make_snapshot, fetch, fallback_rate, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT):
+        LocalizationPoller.__init__(self, fetch, fallback_rate)
+        self.stream_url = stream_url
+        self.make_snapshot = make_snapshot
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.mode = "push"
+        self.push_error = None
+
+    def get_stats(self):
+        stats = LocalizationPoller.get_stats(self)
+        stats["mode"] = self.mode
+        stats["push_error"] = self.push_error
+        return stats
+
+    def _run(self):
+        try:
+            self._run_push()
+        except Exception as e:
+            self.push_error = repr(e)
+
+        if not self.stop_event.is_set():
+            self.mode = "poll"
+            LocalizationPoller._run(self)
+
+    def _run_push(self):
+        parts = urlsplit(self.stream_url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        conn = http_client.HTTPConnection(parts.hostname, parts.port, timeout=self.connect_timeout)
+        try:
+            conn.request("GET", path, headers={"Accept": "text/event-stream"})
+            conn.sock.settimeout(self.read_timeout)
+            response = conn.getresponse()
+            if response.status != 200 or not (response.getheader("Content-Type") or "").startswith("text/event-stream"):
+                raise IOError("no event stream at " + self.stream_url + " (status " + str(response.status) + ")")
+
+            # the stream is close-delimited: read it line by line
+            data_lines = []
+            while not self.stop_event.is_set():
+                line = response.fp.readline()
+                if not line:
+                    raise IOError("event stream closed by the server")
+                line = line.decode("utf-8").rstrip("\r\n")
+
+                if line.startswith("data:"):
+                    data_lines.append(line[5:].strip())
+                elif line == "" and data_lines:
+                    recv_time = time.time()
+                    response_dict = json.loads("\n".join(data_lines))
+                    data_lines = []
+                    self._publish(self.make_snapshot(response_dict), recv_time, 0.0)
+        finally:
+            conn.close()
@@ -0,0 +1,301 @@
+import math
+import socket
+import struct
+import threading
+import time
+import numpy as np
+import ArenaParser
+from ArenaParser import STATE_FIELDS
+from ArenaSnapshot import ArenaSnapshot
+from LocalizationServerInterface import LocalizationServerInterface
+
+NAT_FRAMEOFDATA = 7
+DEFAULT_MULTICAST_GROUP = "239.255.42.99"
+DEFAULT_DATA_PORT = 1511
+MAX_PACKET_SIZE = 65507
+
+# one rigid body of a NatNet 3.x frame of data (38 bytes, packed)
+RIGID_BODY_DTYPE = np.dtype([
+    ("id", "<i4"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("z", "<f4"),
+    ("qx", "<f4"),
+    ("qy", "<f4"),
+    ("qz", "<f4"),
+    ("qw", "<f4"),
+    ("error", "<f4"),
+    ("params", "<i2")
+])
+LABELED_MARKER_SIZE = 26
+TRACKING_VALID = 0x01
+
+_int32 = struct.Struct("<i")
+_header = struct.Struct("<HHi")
+_timing = struct.Struct("<IId")
+
+
+# decode a NatNet 3.x frame-of-data packet: returns (frame_number, timestamp, bodies)
+# where bodies is a RIGID_BODY_DTYPE view into buf (no copy), or None if the packet is
+# not a frame of data. the rigid bodies of skeletons are skipped, so are marker sets,
+# labeled markers, force plates and devices; only the section sizes are read.
+def decode_frame(buf, size=None):
+    if size is None:
+        size = len(buf)
+    (message_id, payload_size, frame_number) = _header.unpack_from(buf, 0)
+    if message_id != NAT_FRAMEOFDATA:
+        return None
+    offset = _header.size
+
+    # marker sets: name (zero terminated), count, count*3 floats
+    (count,) = _int32.unpack_from(buf, offset)
+    offset += 4
+    for i in range(count):
+        offset = buf.index(b"\0", offset, size) + 1
+        (markers,) = _int32.unpack_from(buf, offset)
+        offset += 4 + markers*12
+
+    # unlabeled markers
+    (count,) = _int32.unpack_from(buf, offset)
+    offset += 4 + count*12
+
+    # rigid bodies
+    (count,) = _int32.unpack_from(buf, offset)
+    offset += 4
+    if offset + count*RIGID_BODY_DTYPE.itemsize > size:
+        raise struct.error("truncated NatNet frame")
+    bodies = np.frombuffer(buf, dtype=RIGID_BODY_DTYPE, count=count, offset=offset)
+    offset += count*RIGID_BODY_DTYPE.itemsize
+
+    # skeletons: id, rigid body count, rigid bodies
+    (count,) = _int32.unpack_from(buf, offset)
+    offset += 4
+    for i in range(count):
+        (skeleton_bodies,) = _int32.unpack_from(buf, offset + 4)
+        offset += 8 + skeleton_bodies*RIGID_BODY_DTYPE.itemsize
+
+    # labeled markers
+    (count,) = _int32.unpack_from(buf, offset)
+    offset += 4 + count*LABELED_MARKER_SIZE
+
+    # force plates, then devices: id, channel count, per channel a frame count and floats
+    for section in range(2):
+        (count,) = _int32.unpack_from(buf, offset)
+        offset += 4
+        for i in range(count):
+            (channels,) = _int32.unpack_from(buf, offset + 4)
+            offset += 8
+            for j in range(channels):
+                (frames,) = _int32.unpack_from(buf, offset)
+                offset += 4 + frames*4
+
+    if offset + _timing.size > size:
+        raise struct.error("truncated NatNet frame")
+    (timecode, timecode_sub, timestamp) = _timing.unpack_from(buf, offset)
+    return (frame_number, timestamp, bodies)
+
+# the NatNet 3.x frame-of-data packet of a list of (id, x, y, theta, tracked) rigid
+# bodies lying in the x/y plane (z up), as sent by Motive. used by the replay tool.
+def encode_frame(frame_number, timestamp, bodies):
+    rigid_bodies = np.zeros(len(bodies), dtype=RIGID_BODY_DTYPE)
+    for i, (body_id, x, y, theta, tracked) in enumerate(bodies):
+        rigid_bodies[i] = (body_id, x, y, 0.0, 0.0, 0.0, math.sin(theta/2), math.cos(theta/2), 0.0, TRACKING_VALID if tracked else 0)
+
+    payload = b"".join([
+        _int32.pack(frame_number),
+        _int32.pack(0),                 # marker sets
+        _int32.pack(0),                 # unlabeled markers
+        _int32.pack(len(bodies)), rigid_bodies.tobytes(),
+        _int32.pack(0),                 # skeletons
+        _int32.pack(0),                 # labeled markers
+        _int32.pack(0),                 # force plates
+        _int32.pack(0),                 # devices
+        _timing.pack(0, 0, timestamp),
+        struct.pack("<QQQhi", 0, 0, 0, 0, 0)
+    ])
+    return struct.pack("<HH", NAT_FRAMEOFDATA, len(payload)) + payload
+
+
+# stands in for RESTApiClient: receives Motive's rigid-body stream in a background
+# thread and answers GETs with the newest frame in the OptiTrackRestServer format
+# (name -> "t,x,y,theta,v,w,h" or "untracked"). bodies maps the NatNet rigid body ids
+# to (name, w, h), as the stream carries neither names nor sizes. the pose is taken
+# in the x/y plane (Motive's up axis set to z), theta is the yaw of the orientation
+# and v the speed along the heading, from the displacement since the previous frame
+# (0 on the first frame a body is tracked again). latest_arena() hands out the same
+# frame as numbers. if the socket fails, the receive thread stops and every further
+# read raises IOError with the error.
+class NatNetClient():
+    def __init__(self, bodies, address=DEFAULT_MULTICAST_GROUP, port=DEFAULT_DATA_PORT, interface="0.0.0.0"):
+        self.bodies = dict(bodies)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.settimeout(0.5)
+        if 224 <= int(address.split(".")[0]) <= 239:
+            self.sock.bind(("", port))
+            membership = struct.pack("4s4s", socket.inet_aton(address), socket.inet_aton(interface))
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        else:
+            self.sock.bind((address, port))
+
+        # receive buffer and per-frame arrays, reallocated only when the body count changes
+        self.buffer = bytearray(MAX_PACKET_SIZE)
+        self.ids = ()
+        self.allocate(0)
+        # (ids, columns, names, sizes) of the bodies of the last frame read by latest_arena
+        self.layout = None
+
+        # the newest frame: (timestamp, ids, states), states rows are x, y, theta, v, tracked
+        self.latest = None
+        self.frames = 0
+        self.decode_errors = 0
+        self.last_error = None
+        self.first_frame = threading.Event()
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="NatNetClient")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def allocate(self, n):
+        self.states = np.zeros((5, n))
+        self.previous = np.zeros((3, n))
+        self.previous_t = None
+        # 1 for the bodies tracked in the previous frame, whose displacement is valid
+        self.was_tracked = np.zeros(n)
+        self.dx = np.zeros(n)
+        self.dy = np.zeros(n)
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join()
+        self.sock.close()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                size = self.sock.recv_into(self.buffer)
+            except socket.timeout:
+                continue
+            except socket.error as e:
+                if not self.stop_event.is_set():
+                    self.last_error = repr(e)
+                    print("NatNetClient: receive failed, stopping: " + self.last_error)
+                break
+
+            try:
+                frame = decode_frame(self.buffer, size)
+            except (struct.error, ValueError):
+                self.decode_errors += 1
+                continue
+            if frame is not None:
+                self._update(frame[1], frame[2])
+
+    def _update(self, timestamp, bodies):
+        ids = tuple(bodies["id"].tolist())
+        if ids != self.ids:
+            self.ids = ids
+            self.allocate(len(ids))
+        (x, y, theta, v, tracked) = self.states
+
+        np.copyto(x, bodies["x"])
+        np.copyto(y, bodies["y"])
+        # yaw of the quaternion (rotation about z)
+        (qx, qy, qz, qw) = (bodies["qx"], bodies["qy"], bodies["qz"], bodies["qw"])
+        np.arctan2(2.0*(qw*qz + qx*qy), 1.0 - 2.0*(qy*qy + qz*qz), out=theta)
+        np.copyto(tracked, (bodies["params"] & TRACKING_VALID) != 0)
+
+        # speed along the heading since the previous frame
+        if self.previous_t is not None and timestamp > self.previous_t:
+            np.subtract(x, self.previous[0], out=self.dx)
+            np.subtract(y, self.previous[1], out=self.dy)
+            np.multiply(self.dx, np.cos(theta), out=v)
+            np.multiply(self.dy, np.sin(theta), out=self.dy)
+            np.add(v, self.dy, out=v)
+            np.divide(v, timestamp - self.previous_t, out=v)
+            # no velocity across a dropout: the position jumped while untracked
+            np.multiply(v, self.was_tracked, out=v)
+        else:
+            v.fill(0.0)
+        np.copyto(self.was_tracked, tracked)
+        np.copyto(self.previous[0], x)
+        np.copyto(self.previous[1], y)
+        self.previous_t = timestamp
+
+        # publish a copy: a single reference assignment
+        self.latest = (timestamp, ids, self.states.copy())
+        self.frames += 1
+        self.first_frame.set()
+
+    # block until a first frame was received (or the timeout expires)
+    def wait_first(self, timeout=None):
+        return self.first_frame.wait(timeout)
+
+    # the newest frame of the bodies in self.bodies as (names, states, tracked): states
+    # is an (n, len(STATE_FIELDS)) array (NaN for untracked bodies), ready for
+    # ArenaParser.build_arena. no bodies before the first frame
+    def latest_arena(self):
+        if self.last_error is not None:
+            raise IOError("NatNet receive thread stopped: " + self.last_error)
+        frame = self.latest
+        if frame is None:
+            return ([], np.empty((0, len(STATE_FIELDS))), np.zeros(0, dtype=bool))
+        (timestamp, ids, states) = frame
+
+        # which columns of the frame are known bodies, only redone when the bodies change
+        layout = self.layout
+        if layout is None or layout[0] != ids:
+            columns = [i for (i, body_id) in enumerate(ids) if body_id in self.bodies]
+            names = [self.bodies[ids[i]][0] for i in columns]
+            sizes = np.array([self.bodies[ids[i]][1:] for i in columns], dtype=np.float64).reshape(-1, 2)
+            layout = self.layout = (ids, np.array(columns, dtype=np.intp), names, sizes)
+        (ids, columns, names, sizes) = layout
+
+        # rows t, x, y, theta, v, w, h, transposed once at the end
+        arena_states = np.empty((len(STATE_FIELDS), len(columns)))
+        arena_states[0] = timestamp
+        states.take(columns, axis=1, out=arena_states[1:6])
+        tracked = arena_states[5] != 0.0
+        arena_states[5:] = sizes.T
+        arena_states[:, ~tracked] = np.nan
+        return (names, arena_states.T, tracked)
+
+    def restGETjson(self, query = "", deadline=None):
+        (names, states, tracked) = self.latest_arena()
+        response = {}
+        for (name, values, is_tracked) in zip(names, states.tolist(), tracked.tolist()):
+            response[name] = ArenaParser.format_state(values) if is_tracked else "untracked"
+
+        if query.startswith("?RigidBody="):
+            name = query[len("?RigidBody="):]
+            return {name: response.get(name, "untracked")}
+        return response
+
+    def restPUTjson(self, json_data):
+        pass
+
+
+# a LocalizationServerInterface fed directly from Motive's NatNet stream instead of the
+# OptiTrackRestServer; pass it to DeepRacerController as LocalizationServer. snapshots
+# are built from the decoded numbers, without going through state strings; the
+# whole arena is local, so the dual-rate mode does not apply
+class NatNetLocalizationSource(LocalizationServerInterface):
+    has_server_clock = False
+
+    def __init__(self, bodies, address=DEFAULT_MULTICAST_GROUP, port=DEFAULT_DATA_PORT, interface="0.0.0.0"):
+        LocalizationServerInterface.__init__(self, "natnet://%s:%d" % (address, port))
+        self.rest_client = NatNetClient(bodies, address, port, interface)
+
+    def snapshot(self, robot_name, deadline=None):
+        (names, states, tracked) = self.rest_client.latest_arena()
+        arena = ArenaParser.build_arena(names, states, tracked, self.scene_cache.classifier)
+        return self.observe(ArenaSnapshot.from_arena(arena, robot_name, self.scene_cache), None, time.time())
+
+    def get_hyper_rec_str(self, item_type):
+        return self.snapshot(None).get_hyper_rec_str(item_type)
+
+    def wait_first(self, timeout=None):
+        return self.rest_client.wait_first(timeout)
+
+    def close(self):
+        self.rest_client.close()
@@ -0,0 +1,108 @@
+import numpy as np
+import ArenaParser
+from ArenaParser import KIND_OBSTACLE
+
+DEFAULT_MIN_RATE = 5.0
+DEFAULT_MAX_RATE = 50.0
+DEFAULT_STEP = 0.02         # m travelled between two frames
+DEFAULT_NEAR = 0.2          # m, max_rate at or under this distance to an obstacle
+DEFAULT_FAR = 1.0           # m, no obstacle term beyond it
+DEFAULT_MAX_AGE = 0.05      # s, wanted mean age of the newest frame while moving
+STILL_SPEED = 0.05          # m/s
+LATENCY_GAIN = 0.2
+RATE_DECAY = 0.2            # share of a rate decrease applied per update
+CHANGE_THRESHOLD = 0.1      # relative rate change counted as a change
+
+# picks the localization poll rate (Hz) after every fetched snapshot, within
+# [min_rate, max_rate], as the largest of:
+#   - speed:    |v|/step, so the robot moves about `step` meters between frames
+#   - obstacle: rising linearly from min_rate at `far` to max_rate at `near` meters
+#               from the nearest obstacle hyperrectangle
+#   - latency:  while moving, the rate that keeps the mean age of the newest frame
+#               (server latency + half a period) under max_age
+# increases apply at once, decreases gradually
+class PollRateController():
+    def __init__(self, min_rate=DEFAULT_MIN_RATE, max_rate=DEFAULT_MAX_RATE, step=DEFAULT_STEP, near=DEFAULT_NEAR, far=DEFAULT_FAR, max_age=DEFAULT_MAX_AGE):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.step = step
+        self.near = near
+        self.far = far
+        self.max_age = max_age
+
+        self.rate = max_rate
+        self.latency = None
+
+        # metrics
+        self.updates = 0
+        self.rate_changes = 0
+        self.last_reported_rate = max_rate
+        self.rate_total = 0.0
+        self.rate_min_seen = max_rate
+        self.rate_max_seen = max_rate
+        self.last_terms = {}
+
+    # distance from (x, y) to the nearest tracked obstacle (inf if there is none)
+    def obstacle_distance(self, arena, x, y):
+        obstacles = arena[arena["tracked"] & (arena["kind"] == KIND_OBSTACLE)]
+        if len(obstacles) == 0:
+            return float("inf")
+        boxes = ArenaParser.bounding_boxes(obstacles)
+        dx = np.maximum(np.maximum(boxes[:, 0] - x, x - boxes[:, 1]), 0.0)
+        dy = np.maximum(np.maximum(boxes[:, 2] - y, y - boxes[:, 3]), 0.0)
+        return float(np.hypot(dx, dy).min())
+
+    # the rate to poll at after a snapshot that took fetch_time seconds to get
+    def update(self, snapshot, fetch_time):
+        if self.latency is None:
+            self.latency = fetch_time
+        else:
+            self.latency += LATENCY_GAIN*(fetch_time - self.latency)
+
+        robot = snapshot.arena[(snapshot.arena["name"] == snapshot.robot_name) & snapshot.arena["tracked"]]
+        if len(robot) == 0:
+            # nothing to adapt to: poll fast to catch the robot again
+            target = self.max_rate
+            self.last_terms = {}
+        else:
+            (x, y, v) = (float(robot["x"][0]), float(robot["y"][0]), abs(float(robot["v"][0])))
+            distance = self.obstacle_distance(snapshot.arena, x, y)
+
+            speed_rate = v/self.step
+            closeness = (self.far - distance)/(self.far - self.near)
+            obstacle_rate = self.min_rate + (self.max_rate - self.min_rate)*min(max(closeness, 0.0), 1.0)
+            latency_rate = 0.0
+            if v > STILL_SPEED:
+                if self.latency < self.max_age:
+                    latency_rate = 1.0/(2*(self.max_age - self.latency))
+                else:
+                    latency_rate = self.max_rate
+            target = max(speed_rate, obstacle_rate, latency_rate)
+            self.last_terms = {"speed_rate": speed_rate, "obstacle_rate": obstacle_rate, "latency_rate": latency_rate, "obstacle_distance": distance}
+
+        target = min(max(target, self.min_rate), self.max_rate)
+        if target >= self.rate:
+            self.rate = target
+        else:
+            self.rate += RATE_DECAY*(target - self.rate)
+
+        self.updates += 1
+        self.rate_total += self.rate
+        self.rate_min_seen = min(self.rate_min_seen, self.rate)
+        self.rate_max_seen = max(self.rate_max_seen, self.rate)
+        if abs(self.rate - self.last_reported_rate) > CHANGE_THRESHOLD*self.last_reported_rate:
+            self.rate_changes += 1
+            self.last_reported_rate = self.rate
+        return self.rate
+
+    def get_stats(self):
+        stats = {
+            "rate": self.rate,
+            "rate_avg": self.rate_total/max(self.updates, 1),
+            "rate_min": self.rate_min_seen,
+            "rate_max": self.rate_max_seen,
+            "rate_changes": self.rate_changes,
+            "latency": self.latency
+        }
+        stats.update(self.last_terms)
+        return stats
@@ -0,0 +1,120 @@
+import math
+import threading
+import numpy as np
+
+DEFAULT_ALPHA = 0.5
+DEFAULT_BETA = 0.1
+
+# wrap angles to [-pi, pi)
+def wrap_angle(theta):
+    return (theta + math.pi) % (2*math.pi) - math.pi
+
+
+# alpha-beta filter over the pose stream of all bodies of an arena, one row per body.
+# every frame the poses are predicted to the body's new server timestamp with the
+# estimated velocities, and position, heading and velocities are corrected by
+# alpha/beta times the residual. the heading is kept unwrapped (the residual is taken
+# modulo 2pi), so it does not jump between -pi and pi. the rows follow the bodies of
+# the last arena; while the body names do not change, update() only works in
+# preallocated arrays.
+class PoseFilter():
+    def __init__(self, alpha=DEFAULT_ALPHA, beta=DEFAULT_BETA):
+        self.alpha = alpha
+        self.beta = beta
+        self.names = ()
+        self.rows = {}
+        self.frames = 0
+        self.lock = threading.Lock()
+        self.allocate(0)
+
+    def allocate(self, n):
+        # filter state: x, y, unwrapped theta and their rates
+        self.t = np.full(n, -np.inf)
+        self.pose = np.zeros((3, n))
+        self.rate = np.zeros((3, n))
+        self.initialized = np.zeros(n, dtype=bool)
+        # per-frame buffers
+        self.z = np.zeros((3, n))
+        self.residual = np.zeros((3, n))
+        self.dt = np.zeros(n)
+        self.k_beta = np.zeros(n)
+        self.valid = np.zeros(n, dtype=bool)
+        self.invalid = np.zeros(n, dtype=bool)
+        self.new = np.zeros(n, dtype=bool)
+
+    # re-assign rows when the bodies of the arena changed, keeping the state of the bodies still there
+    def resize(self, names):
+        old = (self.names, self.rows, self.t, self.pose, self.rate, self.initialized)
+        self.allocate(len(names))
+        self.names = names
+        self.rows = dict([(name, i) for i, name in enumerate(names)])
+        (old_names, old_rows, old_t, old_pose, old_rate, old_initialized) = old
+        for i, name in enumerate(names):
+            j = old_rows.get(name)
+            if j is not None:
+                self.t[i] = old_t[j]
+                self.pose[:, i] = old_pose[:, j]
+                self.rate[:, i] = old_rate[:, j]
+                self.initialized[i] = old_initialized[j]
+
+    # feed one parsed arena frame
+    def update(self, arena):
+        names = tuple(arena["name"].tolist())
+        with self.lock:
+            if names != self.names:
+                self.resize(names)
+            self.frames += 1
+
+            tracked = arena["tracked"]
+            self.z[0] = arena["x"]
+            self.z[1] = arena["y"]
+            self.z[2] = arena["theta"]
+
+            # first sight of a body: start at the measurement with zero velocity
+            np.logical_not(self.initialized, out=self.new)
+            np.logical_and(self.new, tracked, out=self.new)
+            np.copyto(self.pose, self.z, where=self.new)
+            np.copyto(self.rate, 0.0, where=self.new)
+            np.copyto(self.t, arena["t"], where=self.new)
+            np.logical_or(self.initialized, self.new, out=self.initialized)
+
+            # rows with a newer measurement: dt > 0, the others are left as they are (dt = 0, zero gains)
+            np.subtract(arena["t"], self.t, out=self.dt)
+            np.greater(self.dt, 0.0, out=self.valid)
+            np.logical_and(self.valid, tracked, out=self.valid)
+            np.logical_not(self.valid, out=self.invalid)
+            np.copyto(self.dt, 0.0, where=self.invalid)
+            np.copyto(self.t, arena["t"], where=self.valid)
+
+            # predict
+            np.multiply(self.rate, self.dt, out=self.residual)
+            np.add(self.pose, self.residual, out=self.pose)
+
+            # residual (heading residual wrapped to [-pi, pi)); zero for the rows not updated
+            np.copyto(self.z, self.pose, where=self.invalid)
+            np.subtract(self.z, self.pose, out=self.residual)
+            self.residual[2] += math.pi
+            np.mod(self.residual[2], 2*math.pi, out=self.residual[2])
+            self.residual[2] -= math.pi
+
+            # correct
+            np.divide(self.beta, self.dt, out=self.k_beta, where=self.valid)
+            np.copyto(self.k_beta, 0.0, where=self.invalid)
+            np.multiply(self.residual, self.k_beta, out=self.z)
+            np.add(self.rate, self.z, out=self.rate)
+            np.multiply(self.residual, self.alpha, out=self.residual)
+            np.add(self.pose, self.residual, out=self.pose)
+
+    # filtered (x, y, theta, v) of a body, v being the speed along the heading (None if
+    # the body was never tracked). theta is wrapped to [-pi, pi) unless wrap is False.
+    def state(self, name, wrap=True):
+        with self.lock:
+            i = self.rows.get(name)
+            if i is None or not self.initialized[i]:
+                return None
+            (x, y, theta) = self.pose[:, i].tolist()
+            (vx, vy) = self.rate[:2, i].tolist()
+        v = vx*math.cos(theta) + vy*math.sin(theta)
+        if wrap:
+            theta = wrap_angle(theta)
+        return [x, y, theta, v]
@@ -1,24 +1,77 @@
-#import requests
-import httplib2
 import json
+import HTTPTransport
+from SingleFlight import SingleFlight
+from RetryPolicy import RetryPolicy, ServerError
 
 class RESTApiClient():
-    def __init__(self, url):
+    # freshness: seconds for which a GET result is reused instead of asking again
+    # (concurrent identical GETs are always merged into one request)
+    # retry_policy: how failed GETs are retried (see RetryPolicy); POSTs are not
+    # idempotent (a pFaces synthesis or control request, an acknowledgment) and are
+    # sent once
+    def __init__(self, url, connect_timeout=None, read_timeout=None, transport=None, freshness=0.0, retry_policy=None):
         self.url = url
-        #self.session = requests.Session()
-        #self.session.trust_env = False
-        self.http = httplib2.Http()
+        # per-request timeouts (None = the transport's defaults)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # persistent keep-alive connections, shared with the other clients by default
+        if transport is None:
+            transport = HTTPTransport.default_transport()
+        self.transport = transport
+        self.single_flight = SingleFlight(freshness)
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self.retry_policy = retry_policy
+        # a single attempt, for the deadline handling and the counters
+        self.post_policy = RetryPolicy(max_attempts=1)
     
-    def restGETjson(self, query = ""):
-        #return self.session.get(self.url + query).json()
-        return json.loads(self.http.request(self.url, method="GET")[1])
+    # the returned dictionary may be shared with other callers: do not modify it.
+    # deadline (an absolute time.time()) bounds the request and its retries; past it
+    # RetryPolicy.DeadlineExceeded is raised
+    def restGETjson(self, query = "", deadline=None):
+        return self.single_flight.call(query, lambda: self.fetchGETjson(query, deadline), deadline)
 
-    def restPUTjson(self, json_data):
-        self.http.request(
-            self.url,
-            method='POST',
-            headers={'Content-Type': 'application/json; charset=UTF-8'},
-            body=json.dumps(json_data)
-        )
-        #self.session.put(self.url, json=json_data)
+    def fetchGETjson(self, query = "", deadline=None):
+        def attempt(timeout):
+            (status, data) = self.transport.request("GET", self.url + query,
+                connect_timeout=self.timeout(self.connect_timeout, timeout), read_timeout=self.timeout(self.read_timeout, timeout))
+            if status >= 500:
+                raise ServerError("HTTP status " + str(status))
+            return json.loads(data.decode("utf-8"))
+        return self.retry_policy.run("GET " + self.url, attempt, deadline)
 
+    # returns the decoded JSON answer, None if the server sent none
+    def restPUTjson(self, json_data, deadline=None):
+        body = json.dumps(json_data)
+        def attempt(timeout):
+            (status, data) = self.transport.request(
+                "POST",
+                self.url,
+                headers={'Content-Type': 'application/json; charset=UTF-8'},
+                body=body,
+                connect_timeout=self.timeout(self.connect_timeout, timeout),
+                read_timeout=self.timeout(self.read_timeout, timeout)
+            )
+            if status >= 500:
+                raise ServerError("HTTP status " + str(status))
+            try:
+                return json.loads(data.decode("utf-8"))
+            except ValueError:
+                return None
+        return self.post_policy.run("POST " + self.url, attempt, deadline)
+
+    # a configured timeout cut to the time left before the deadline
+    def timeout(self, configured, left):
+        if left is None:
+            return configured
+        if configured is None:
+            return left
+        return min(configured, left)
+
+    # GET counters: fresh results reused (hits), requests joined while in flight
+    # (coalesced) and requests sent (misses), and the retry counters per endpoint
+    def get_stats(self):
+        stats = self.single_flight.get_stats()
+        stats["retries"] = self.retry_policy.get_stats()
+        stats["retries"].update(self.post_policy.get_stats())
+        return stats
@@ -0,0 +1,65 @@
+import time
+import FrameRecorder
+from LocalizationServerInterface import LocalizationServerInterface
+
+# stands in for RESTApiClient: answers GETs from a recording instead of the server.
+# speed=1.0 replays in real time, speed=k k times faster (by the receive timestamps),
+# and speed=0.0 as fast as possible, i.e. every GET returns the next frame. after the
+# last frame every body reads as missing (so the controller stops on "untracked").
+class ReplayRESTApiClient():
+    def __init__(self, path, speed=1.0):
+        (self.records, self.starts) = FrameRecorder.load_recording(path)
+        self.frame_count = len(self.starts) - 1
+        self.recv_times = self.records["recv_time"][self.starts[:-1]]
+        self.speed = speed
+        self.start_time = None
+        self.next_frame = 0
+
+        # the recording ends one mean frame interval after its last frame
+        self.end_time = None
+        if self.frame_count > 0:
+            self.end_time = self.recv_times[-1]
+            if self.frame_count > 1:
+                self.end_time += (self.recv_times[-1] - self.recv_times[0])/(self.frame_count - 1)
+
+    # the frame to serve now (frame_count once the recording is over)
+    def frame_index(self):
+        if self.speed <= 0.0:
+            self.next_frame += 1
+            return min(self.next_frame - 1, self.frame_count)
+
+        if self.frame_count == 0:
+            return 0
+        now = time.time()
+        if self.start_time is None:
+            self.start_time = now
+        replay_time = self.recv_times[0] + (now - self.start_time)*self.speed
+        if replay_time > self.end_time:
+            return self.frame_count
+        # the last frame received at or before the replay clock
+        return int(self.recv_times.searchsorted(replay_time, side="right")) - 1
+
+    def restGETjson(self, query = "", deadline=None):
+        index = self.frame_index()
+        if index >= self.frame_count:
+            response = {}
+        else:
+            response = FrameRecorder.frame_response(self.records[self.starts[index]:self.starts[index+1]])
+
+        if query.startswith("?RigidBody="):
+            name = query[len("?RigidBody="):]
+            return {name: response.get(name, "untracked")}
+        return response
+
+    def restPUTjson(self, json_data):
+        pass
+
+
+# a LocalizationServerInterface fed from a FrameRecorder recording, so the controller
+# stack can be run and benchmarked offline
+class ReplayLocalizationServerInterface(LocalizationServerInterface):
+    has_server_clock = False
+
+    def __init__(self, path, speed=1.0):
+        LocalizationServerInterface.__init__(self, "replay://" + path)
+        self.rest_client = ReplayRESTApiClient(path, speed)
@@ -0,0 +1,99 @@
+import random
+import socket
+import threading
+import time
+from HTTPTransport import http_client
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.01
+DEFAULT_MAX_DELAY = 0.5
+# an attempt needs at least this much of the budget to be worth starting
+MIN_ATTEMPT_TIME = 0.002
+
+# a request could not be completed within the deadline its caller gave
+class DeadlineExceeded(Exception):
+    pass
+
+# a server answered with a 5xx status (worth retrying)
+class ServerError(IOError):
+    pass
+
+RETRYABLE_ERRORS = (socket.error, IOError, http_client.HTTPException)
+
+
+# retries failed requests (connection errors, 5xx answers) with jittered exponential
+# backoff: attempt k (from 0) is followed by a pause drawn uniformly from
+# [0, min(max_delay, base_delay*2^k)]. a request that timed out is not retried.
+# with a deadline (an absolute time.time()), every attempt's timeout is cut to the
+# time left, and DeadlineExceeded is raised as soon as the budget cannot cover the
+# next attempt, instead of sleeping past it. counters are kept per endpoint.
+class RetryPolicy():
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = random.Random()
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def count(self, endpoint, counter):
+        with self.lock:
+            counters = self.counters.setdefault(endpoint, {"requests": 0, "retries": 0, "timeouts": 0, "failures": 0})
+            counters[counter] += 1
+
+    # call attempt(timeout) until it returns; timeout is the time left before the
+    # deadline (None without one)
+    def run(self, endpoint, attempt, deadline=None):
+        self.count(endpoint, "requests")
+        for k in range(self.max_attempts):
+            timeout = self.attempt_timeout(endpoint, k, deadline)
+            try:
+                return attempt(timeout)
+            except socket.timeout as e:
+                error = self.timeout_error(endpoint, e, deadline)
+                if error is not None:
+                    raise error
+                raise
+            except RETRYABLE_ERRORS:
+                if self.last_attempt(endpoint, k):
+                    raise
+            time.sleep(self.backoff(endpoint, k, deadline))
+
+    # the steps of run(), shared with AsyncRESTApiClient:
+    # the time left for attempt k (None without a deadline), DeadlineExceeded if too little
+    def attempt_timeout(self, endpoint, k, deadline):
+        if deadline is None:
+            return None
+        timeout = deadline - time.time()
+        if timeout < MIN_ATTEMPT_TIME:
+            self.count(endpoint, "timeouts")
+            raise DeadlineExceeded(endpoint + ": no time left for attempt " + str(k + 1))
+        return timeout
+
+    # an attempt timed out: the DeadlineExceeded to raise if the deadline has come, else
+    # None (the timeout itself is raised, it is not retried)
+    def timeout_error(self, endpoint, error, deadline):
+        self.count(endpoint, "timeouts")
+        if deadline is not None and time.time() >= deadline - MIN_ATTEMPT_TIME:
+            return DeadlineExceeded(endpoint + ": " + repr(error))
+        return None
+
+    # attempt k failed: True (the error is to be raised) if it was the last one
+    def last_attempt(self, endpoint, k):
+        if k == self.max_attempts - 1:
+            self.count(endpoint, "failures")
+            return True
+        return False
+
+    # the pause after the failed attempt k, DeadlineExceeded if it would pass the deadline
+    def backoff(self, endpoint, k, deadline):
+        delay = self.rng.uniform(0.0, min(self.max_delay, self.base_delay*2**k))
+        if deadline is not None and time.time() + delay + MIN_ATTEMPT_TIME > deadline:
+            self.count(endpoint, "timeouts")
+            raise DeadlineExceeded(endpoint + ": backoff would pass the deadline")
+        self.count(endpoint, "retries")
+        return delay
+
+    def get_stats(self):
+        with self.lock:
+            return dict([(endpoint, dict(counters)) for endpoint, counters in self.counters.items()])
@@ -0,0 +1,61 @@
+import collections
+import threading
+import numpy as np
+import ArenaParser
+from ArenaParser import KIND_TARGET, KIND_OBSTACLE
+from BodyClassifier import DEFAULT_CLASSIFIER
+
+DEFAULT_EPSILON = 0.005
+
+# the cached target/obstacle hyperrectangles of one scene generation
+class SceneView(collections.namedtuple("SceneView", ["generation", "targets", "obstacles", "targets_str", "obstacles_str"])):
+    __slots__ = ()
+
+
+# keeps the last geometry (x, y, w, h) and hyperrectangle string of every tracked
+# target/obstacle. a string is re-formatted only when its body moved or resized by
+# more than epsilon, and the generation counter only changes when some body did
+# (or a body appeared/disappeared), so callers can compare generations to learn
+# that the scene is unchanged. the classifier sets the kinds of the parsed arenas and
+# the theta/v bounds of the strings.
+class SceneCache():
+    def __init__(self, epsilon=DEFAULT_EPSILON, classifier=DEFAULT_CLASSIFIER):
+        self.epsilon = epsilon
+        self.classifier = classifier
+        self.generation = 0
+        self.names = ()
+        self.geometry = np.zeros((0, 4))
+        self.strings = []
+        self.view = SceneView(0, (), (), "", "")
+        self.lock = threading.Lock()
+
+    # update the cache from a parsed arena and return the current SceneView
+    def update(self, arena):
+        mask = arena["tracked"] & ((arena["kind"] == KIND_TARGET) | (arena["kind"] == KIND_OBSTACLE))
+        bodies = arena[mask]
+        names = tuple(bodies["name"].tolist())
+        geometry = np.column_stack((bodies["x"], bodies["y"], bodies["w"], bodies["h"]))
+
+        with self.lock:
+            if names == self.names:
+                moved = np.flatnonzero((np.abs(geometry - self.geometry) > self.epsilon).any(axis=1))
+                if len(moved) == 0:
+                    return self.view
+                strings = list(self.strings)
+                for i in moved:
+                    strings[i] = ArenaParser.hyper_rec_strings(bodies[i:i+1], bodies["kind"][i], self.classifier.theta_v)[0][1]
+                    self.geometry[i] = geometry[i]
+            else:
+                strings = [ArenaParser.hyper_rec_strings(bodies[i:i+1], bodies["kind"][i], self.classifier.theta_v)[0][1] for i in range(len(bodies))]
+                self.names = names
+                self.geometry = geometry
+
+            self.strings = strings
+            self.generation += 1
+
+            kinds = bodies["kind"].tolist()
+            targets = tuple([(names[i], strings[i]) for i in range(len(names)) if kinds[i] == KIND_TARGET])
+            obstacles = tuple([(names[i], strings[i]) for i in range(len(names)) if kinds[i] == KIND_OBSTACLE])
+            self.view = SceneView(self.generation, targets, obstacles,
+                "|".join([hr for (name, hr) in targets]), "|".join([hr for (name, hr) in obstacles]))
+            return self.view
@@ -0,0 +1,245 @@
+import errno
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+import RESTApiClient
+from LocalizationServerInterface import LocalizationServerInterface
+
+MAGIC = 0x44524C43        # "DRLC"
+VERSION = 1
+DEFAULT_SLOTS = 16
+DEFAULT_MAX_BODIES = 64
+DEFAULT_RATE = 100.0
+STATE_SIZE = 160
+READ_RETRIES = 100
+NAME_SIZE = 32
+WRITER_CHECK_INTERVAL = 1.0     # s between two checks that the writer process still runs
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+def default_path():
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "deepracer_localization")
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "<u4"),
+    ("version", "<u4"),
+    ("slots", "<u4"),
+    ("max_bodies", "<u4"),
+    ("latest", "<i8"),          # number of the newest complete frame, -1 before the first
+    ("writer_pid", "<u4"),
+    ("rate", "<f4")
+])
+
+# one body of a frame: its name and state string as returned by the server
+BODY_DTYPE = np.dtype([
+    ("name", "S%d" % NAME_SIZE),
+    ("state", "S%d" % STATE_SIZE)
+])
+
+def layout(slots, max_bodies):
+    slot = np.dtype([
+        ("seq", "<u8"),         # seqlock: odd while the slot is being written
+        ("recv_time", "<f8"),
+        ("count", "<u4"),
+        ("bodies", BODY_DTYPE, (max_bodies,))
+    ])
+    return np.dtype([("header", HEADER_DTYPE), ("slots", slot, (slots,))])
+
+
+# a ring of arena frames in a memory-mapped file, written by one process and read by
+# any number of others. frame n goes to slot n % slots, whose sequence number is set
+# to 2n+1 before and 2n+2 after the write; a reader takes the frame only if the slot
+# holds 2n+2 both before and after reading it, and otherwise retries with the newest
+# frame. a read takes no socket, file or JSON work, but copies the newest frame out of
+# the mapping into a fresh dictionary. a reader raises IOError once the writer process
+# (writer_pid) is gone, rather than serving its last frame forever.
+class SharedFrameRing():
+    def __init__(self, path=None, slots=DEFAULT_SLOTS, max_bodies=DEFAULT_MAX_BODIES, writer=False):
+        self.path = default_path() if path is None else path
+        self.writer = writer
+        if writer:
+            self.map = self.open_writer(layout(slots, max_bodies))
+            header = self.map["header"]
+            header["magic"] = MAGIC
+            header["version"] = VERSION
+            header["slots"] = slots
+            header["max_bodies"] = max_bodies
+            header["writer_pid"] = os.getpid()
+        else:
+            header = np.memmap(self.path, dtype=HEADER_DTYPE, mode="r", shape=(1,))
+            if header["magic"][0] != MAGIC or header["version"][0] != VERSION:
+                raise IOError("not a localization cache: " + self.path)
+            (slots, max_bodies) = (int(header["slots"][0]), int(header["max_bodies"][0]))
+            self.map = np.memmap(self.path, dtype=layout(slots, max_bodies), mode="r", shape=(1,))
+        # views into the mapping: header fields are 1-element arrays, slot fields have one row per slot
+        self.header = self.map["header"]
+        self.seq = self.map["slots"]["seq"][0]
+        self.recv_time = self.map["slots"]["recv_time"][0]
+        self.count = self.map["slots"]["count"][0]
+        self.bodies = self.map["slots"]["bodies"][0]
+        self.slot_count = slots
+        self.max_bodies = max_bodies
+        self.retries = 0
+        self.next_writer_check = 0.0
+
+    # map the ring for writing without truncating a file readers may have mapped: a ring
+    # of the same layout is taken over in place (its frame numbers go on), anything else
+    # is replaced by a new file renamed over it (readers keep the old one until they reopen)
+    def open_writer(self, dtype):
+        if os.path.exists(self.path) and os.path.getsize(self.path) == dtype.itemsize:
+            ring = np.memmap(self.path, dtype=dtype, mode="r+", shape=(1,))
+            header = ring["header"]
+            if header["magic"][0] == MAGIC and header["version"][0] == VERSION:
+                pid = int(header["writer_pid"][0])
+                if pid != os.getpid() and process_alive(pid):
+                    raise IOError("localization cache " + self.path + " is written by process " + str(pid))
+                return ring
+            del ring
+
+        temp_path = self.path + ".%d.tmp" % os.getpid()
+        fd = os.open(temp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, dtype.itemsize)
+        finally:
+            os.close(fd)
+        ring = np.memmap(temp_path, dtype=dtype, mode="r+", shape=(1,))
+        ring["header"]["latest"] = -1
+        os.rename(temp_path, self.path)
+        return ring
+
+    # raise IOError if the process writing the ring has ended
+    def check_writer(self):
+        now = time.time()
+        if now < self.next_writer_check:
+            return
+        self.next_writer_check = now + WRITER_CHECK_INTERVAL
+        pid = int(self.header["writer_pid"][0])
+        if not process_alive(pid):
+            raise IOError("localization cache " + self.path + " is stale: its writer (process " + str(pid) + ") is gone")
+
+    # append one arena response (a dict: name -> "t,x,y,theta,v,w,h" or "untracked")
+    def write(self, response, recv_time):
+        items = [(name.encode("utf-8"), state.encode("utf-8")) for name, state in response.items()]
+        if len(items) > self.max_bodies:
+            raise ValueError("%d bodies do not fit the localization cache (max_bodies=%d)" % (len(items), self.max_bodies))
+        for (name, state) in items:
+            if len(name) > NAME_SIZE or len(state) > STATE_SIZE:
+                raise ValueError("body name or state too long for the localization cache: " + repr(name))
+
+        n = int(self.header["latest"][0]) + 1
+        i = n % self.slot_count
+
+        self.seq[i] = 2*n + 1
+        self.recv_time[i] = recv_time
+        self.count[i] = len(items)
+        bodies = self.bodies[i]
+        for j, (name, state) in enumerate(items):
+            bodies[j] = (name, state)
+        self.seq[i] = 2*n + 2
+        self.header["latest"] = n
+
+    # (frame number, receive time, arena response) of the newest frame, or None if
+    # nothing was written yet
+    def read(self):
+        self.check_writer()
+        for attempt in range(READ_RETRIES):
+            n = int(self.header["latest"][0])
+            if n < 0:
+                return None
+            i = n % self.slot_count
+            if int(self.seq[i]) != 2*n + 2:
+                self.retries += 1
+                continue
+
+            recv_time = float(self.recv_time[i])
+            bodies = self.bodies[i][:int(self.count[i])]
+            response = dict(zip([name.decode("utf-8") for name in bodies["name"].tolist()], [state.decode("utf-8") for state in bodies["state"].tolist()]))
+
+            if int(self.seq[i]) == 2*n + 2:
+                return (n, recv_time, response)
+            self.retries += 1
+        raise IOError("localization cache is being overwritten faster than it can be read")
+
+    def close(self):
+        if self.writer:
+            self.map.flush()
+
+
+# polls the localization server once at a fixed rate and writes every response to a
+# SharedFrameRing, so any number of local processes can read the arena without
+# querying the server themselves (see tools/localization_cache_daemon.py)
+class LocalizationCacheDaemon():
+    def __init__(self, url, rate=DEFAULT_RATE, path=None, slots=DEFAULT_SLOTS, max_bodies=DEFAULT_MAX_BODIES):
+        self.rest_client = RESTApiClient.RESTApiClient(url)
+        self.ring = SharedFrameRing(path, slots, max_bodies, writer=True)
+        self.ring.header["rate"] = rate
+        self.period = 1.0/rate
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.last_error = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="LocalizationCacheDaemon")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        while not self.stop_event.is_set():
+            fetch_start = time.time()
+            try:
+                response = self.rest_client.restGETjson()
+                self.ring.write(response, time.time())
+                self.fetches += 1
+            except Exception as e:
+                self.fetch_errors += 1
+                self.last_error = repr(e)
+
+            remaining = self.period - (time.time() - fetch_start)
+            if remaining > 0.0:
+                self.stop_event.wait(remaining)
+
+
+# stands in for RESTApiClient: answers GETs from the newest frame of the shared cache
+class SharedCacheClient():
+    def __init__(self, path=None):
+        self.ring = SharedFrameRing(path)
+
+    def restGETjson(self, query = "", deadline=None):
+        frame = self.ring.read()
+        response = {} if frame is None else frame[2]
+        if query.startswith("?RigidBody="):
+            name = query[len("?RigidBody="):]
+            return {name: response.get(name, "untracked")}
+        return response
+
+    def restPUTjson(self, json_data):
+        pass
+
+
+# a LocalizationServerInterface reading from a LocalizationCacheDaemon on this machine
+# instead of the server; pass it to DeepRacerController as LocalizationServer
+class SharedLocalizationServerInterface(LocalizationServerInterface):
+    has_server_clock = False
+
+    def __init__(self, path=None):
+        LocalizationServerInterface.__init__(self, "shm://" + (default_path() if path is None else path))
+        self.rest_client = SharedCacheClient(path)
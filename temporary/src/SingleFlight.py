@@ -0,0 +1,72 @@
+import threading
+import time
+from RetryPolicy import DeadlineExceeded
+
+# one call in flight: the waiters block on done and then share result (or error)
+class Flight():
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# coalesces concurrent calls with the same key: the first caller runs the function,
+# the others wait for it and get the same result (or exception). a result younger
+# than `freshness` seconds is handed out again without calling at all. results are
+# shared between callers, so they must not be modified. a caller waiting for another's
+# call gives up with DeadlineExceeded at its deadline (an absolute time.time()).
+class SingleFlight():
+    def __init__(self, freshness=0.0):
+        self.freshness = freshness
+        self.flights = {}       # key -> Flight
+        self.results = {}       # key -> (time, result)
+        self.lock = threading.Lock()
+
+        # counters
+        self.hits = 0           # fresh result reused
+        self.coalesced = 0      # joined a call in flight
+        self.misses = 0         # called the function
+
+    def call(self, key, function, deadline=None):
+        with self.lock:
+            if self.freshness > 0.0 and key in self.results:
+                (result_time, result) = self.results[key]
+                if time.time() - result_time <= self.freshness:
+                    self.hits += 1
+                    return result
+
+            flight = self.flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = Flight()
+                self.flights[key] = flight
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            if deadline is None:
+                flight.done.wait()
+            elif not flight.done.wait(max(0.0, deadline - time.time())):
+                raise DeadlineExceeded(str(key) + ": still in flight at the deadline")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = function()
+        except Exception as e:
+            flight.error = e
+        with self.lock:
+            del self.flights[key]
+            if flight.error is None and self.freshness > 0.0:
+                self.results[key] = (time.time(), flight.result)
+        flight.done.set()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def get_stats(self):
+        return {"hits": self.hits, "coalesced": self.coalesced, "misses": self.misses}
@@ -0,0 +1,40 @@
+import collections
+import DeepRacer
+
+DEFAULT_WINDOW = 20
+MAX_DELAY = 1.0
+
+# compensates the pipeline delay between the OptiTrack measurement and the moment the
+# resulting action is applied: the measured state (x, y, theta, v) is forward-integrated
+# with DeepRacer.simulate under the last applied action over a rolling estimate of
+# that delay (the mean of the last `window` measured delays, capped at max_delay)
+class StatePredictor():
+    def __init__(self, window=DEFAULT_WINDOW, max_delay=MAX_DELAY):
+        self.delays = collections.deque(maxlen=window)
+        self.max_delay = max_delay
+
+    # record the delay measured in one control loop (state age + fetch + control time)
+    def observe_delay(self, delay):
+        self.delays.append(min(delay, self.max_delay))
+
+    def delay_estimate(self):
+        if len(self.delays) == 0:
+            return 0.0
+        return sum(self.delays)/len(self.delays)
+
+    # the state expected once the next action is applied; action is the last one sent
+    # to the car ([angle, throttle], "stop" or None)
+    def predict(self, s, action):
+        return extrapolate(s, action, self.delay_estimate())
+
+
+# integrate the state (x, y, theta, v) over dt seconds under an applied action
+def extrapolate(s, action, dt):
+    if dt <= 0.0:
+        return list(s)
+
+    if action is None or action == "stop":
+        u = [0.0, 0]
+    else:
+        u = [action[0], DeepRacer.map_trottle(action[1])]
+    return [float(x) for x in DeepRacer.simulate(list(s), u, dt)]
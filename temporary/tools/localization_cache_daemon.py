@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# polls the OptiTrackRestServer once for all local clients: every response is written
+# to a shared-memory ring (see src/SharedLocalizationCache.py), which the controller,
+# visualizers and loggers of this machine read through
+# SharedLocalizationServerInterface instead of querying the server themselves.
+#
+#   $ python3 localization_cache_daemon.py --server 192.168.1.194:12345 --rate 100 [--path /dev/shm/deepracer_localization]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from SharedLocalizationCache import LocalizationCacheDaemon, default_path, DEFAULT_RATE, DEFAULT_SLOTS, DEFAULT_MAX_BODIES
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared localization cache daemon")
+    parser.add_argument("--server", required=True, help="localization server host:port")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="polls per second")
+    parser.add_argument("--path", default=default_path(), help="shared ring file")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS)
+    parser.add_argument("--max-bodies", type=int, default=DEFAULT_MAX_BODIES)
+    args = parser.parse_args()
+
+    daemon = LocalizationCacheDaemon("http://" + args.server + "/OptiTrackRestServer", args.rate, args.path, args.slots, args.max_bodies)
+    daemon.start()
+    print("Caching http://" + args.server + "/OptiTrackRestServer into " + args.path)
+    try:
+        while True:
+            time.sleep(10.0)
+            print("fetches=" + str(daemon.fetches) + ", fetch_errors=" + str(daemon.fetch_errors) + ", last_error=" + str(daemon.last_error))
+    except KeyboardInterrupt:
+        daemon.stop()
+        daemon.ring.close()
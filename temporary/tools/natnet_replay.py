@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# a local stand-in for Motive's NatNet data stream: replays arena frames (see
+# optitrack_standin.py) as NatNet 3.x frame-of-data packets over UDP, so
+# NatNetLocalizationSource can be run without the cameras.
+#
+# rigid body ids are given to the bodies in the order of their names; the mapping is
+# printed in the form NatNetLocalizationSource expects (id -> (name, w, h)).
+#
+#   $ python3 natnet_replay.py --address 127.0.0.1 --port 1511 --rate 120 [--frames run.jsonl]
+#   $ python3 natnet_replay.py --address 239.255.42.99      (multicast, like Motive)
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from NatNetLocalizationSource import encode_frame, DEFAULT_MULTICAST_GROUP, DEFAULT_DATA_PORT
+from optitrack_standin import load_frames, synthetic_frames, FaultInjector
+
+
+# id -> (name, w, h) of every body seen in the frames (w and h from its first tracked state)
+def body_table(frames):
+    sizes = {}
+    for frame in frames:
+        for name, value in frame.items():
+            if name not in sizes and value != "untracked":
+                (w, h) = [float(v) for v in value.split(",")[5:7]]
+                sizes[name] = (w, h)
+    return dict([(i + 1, (name,) + sizes[name]) for i, name in enumerate(sorted(sizes))])
+
+# the NatNet packet of one arena frame
+def frame_packet(frame, frame_number, timestamp, ids):
+    bodies = []
+    for name, body_id in ids.items():
+        value = frame.get(name, "untracked")
+        if value == "untracked":
+            bodies.append((body_id, 0.0, 0.0, 0.0, False))
+        else:
+            (x, y, theta) = [float(v) for v in value.split(",")[1:4]]
+            bodies.append((body_id, x, y, theta, True))
+    return encode_frame(frame_number, timestamp, bodies)
+
+def replay(frames, rate, address, port, faults=None, loop=True):
+    table = body_table(frames)
+    ids = dict([(name, body_id) for body_id, (name, w, h) in table.items()])
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+
+    start = time.time()
+    index = 0
+    while loop or index < len(frames):
+        frame = frames[index % len(frames)]
+        if faults is not None:
+            frame = faults.apply_dropouts(frame, index)
+        sock.sendto(frame_packet(frame, index, index/rate, ids), (address, port))
+        index += 1
+        remaining = start + index/rate - time.time()
+        if remaining > 0.0:
+            time.sleep(remaining)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local NatNet stream stand-in")
+    parser.add_argument("--address", default=DEFAULT_MULTICAST_GROUP, help="destination (unicast or multicast group)")
+    parser.add_argument("--port", type=int, default=DEFAULT_DATA_PORT)
+    parser.add_argument("--rate", type=float, default=120.0, help="frames per second")
+    parser.add_argument("--frames", help="recording to replay (one JSON arena dictionary per line, or a FrameRecorder .bin file)")
+    parser.add_argument("--dropout-prob", type=float, default=0.0)
+    parser.add_argument("--dropout-time", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames) if args.frames else synthetic_frames(args.rate)
+    faults = FaultInjector(dropout_prob=args.dropout_prob, dropout_time=args.dropout_time, seed=args.seed)
+    print("Streaming " + str(len(frames)) + " frames to " + args.address + ":" + str(args.port))
+    print("bodies = " + repr(body_table(frames)))
+    try:
+        replay(frames, args.rate, args.address, args.port, faults)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# a local stand-in for the OptiTrackRestServer on the media server, so the
+# localization clients can be run and benchmarked without the cameras.
+#
+#   GET /OptiTrackRestServer                     -> the current arena dictionary
+#   GET /OptiTrackRestServer?RigidBody=<name>    -> {<name>: <state>}
+#   GET /OptiTrackRestServer/stream              -> server-sent events, one arena
+#                                                   dictionary per frame
+#
+# frames are replayed from a recording (one JSON arena dictionary per line, or a
+# FrameRecorder .bin file) or generated: a DeepRacer driving a circle next to a
+# static target and obstacle.
+#
+# faults can be injected to reproduce what the clients see on the lab network:
+#   --latency DIST            delay of every REST response, DIST is one of
+#                             fixed:S  uniform:A,B  normal:MU,SIGMA  lognormal:MU,SIGMA  exp:MEAN
+#   --stall-prob P            probability that a request stalls ...
+#   --stall-time S            ... for S seconds before it is answered
+#   --first-connection-delay S  the first request on every new connection (client address
+#                             and port) waits S seconds, e.g. 150 for the "2-3 minute first connection"
+#   --dropout-prob P          per frame and body, probability that the body becomes
+#   --dropout-time S          "untracked" for S seconds
+#
+#   $ python3 optitrack_standin.py --port 12345 --rate 100 [--frames run.jsonl] \
+#         [--latency lognormal:-4.5,0.5] [--stall-prob 0.01 --stall-time 2] [--seed 1]
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qs
+
+BASE_PATH = "/OptiTrackRestServer"
+
+
+def load_frames(path):
+    if path.endswith(".bin"):
+        sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+        import FrameRecorder
+        (records, starts) = FrameRecorder.load_recording(path)
+        return [FrameRecorder.frame_response(records[starts[i]:starts[i+1]]) for i in range(len(starts) - 1)]
+
+    frames = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                frames.append(json.loads(line))
+    return frames
+
+def synthetic_frames(rate, duration=20.0, robot_name="DeepRacer1"):
+    frames = []
+    radius = 1.0
+    omega = 0.5
+    for i in range(int(duration*rate)):
+        t = i/float(rate)
+        x = radius*math.cos(omega*t)
+        y = radius*math.sin(omega*t)
+        theta = math.atan2(math.cos(omega*t), -math.sin(omega*t))
+        frames.append({
+            robot_name: "{:.4f},{:.4f},{:.4f},{:.4f},{:.4f},0.2000,0.1000".format(t, x, y, theta, radius*omega),
+            "Target1": "{:.4f},1.5000,1.5000,0.0000,0.0000,0.4000,0.4000".format(t),
+            "Obstacle1": "{:.4f},0.0000,0.0000,0.0000,0.0000,0.5000,0.5000".format(t)
+        })
+    return frames
+
+
+# a latency sampler from a "kind:params" description (see the header)
+def latency_sampler(description, rng):
+    (kind, _, params) = description.partition(":")
+    params = [float(p) for p in params.split(",")] if params else []
+    if kind == "fixed":
+        return lambda: params[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(params[0], params[1])
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == "lognormal":
+        return lambda: rng.lognormvariate(params[0], params[1])
+    if kind == "exp":
+        return lambda: rng.expovariate(1.0/params[0])
+    raise ValueError("unknown latency distribution: " + description)
+
+
+# the configured faults, shared by all request handler threads
+class FaultInjector():
+    def __init__(self, latency=None, stall_prob=0.0, stall_time=0.0, first_connection_delay=0.0, dropout_prob=0.0, dropout_time=0.0, seed=None):
+        self.rng = random.Random(seed)
+        self.latency = latency_sampler(latency, self.rng) if latency else None
+        self.stall_prob = stall_prob
+        self.stall_time = stall_time
+        self.first_connection_delay = first_connection_delay
+        self.dropout_prob = dropout_prob
+        self.dropout_time = dropout_time
+        self.seen_connections = set()
+        self.dropped_until = {}
+        self.last_index = None
+        self.lock = threading.Lock()
+
+    # how long to hold the response to a request on the given connection ((host, port)
+    # of the client)
+    def request_delay(self, client_address):
+        with self.lock:
+            delay = self.latency() if self.latency else 0.0
+            if self.stall_prob > 0.0 and self.rng.random() < self.stall_prob:
+                delay += self.stall_time
+            if client_address not in self.seen_connections:
+                self.seen_connections.add(client_address)
+                delay += self.first_connection_delay
+        return delay
+
+    # the frame with the bodies currently dropped out reported as untracked
+    def apply_dropouts(self, frame, index):
+        if self.dropout_prob <= 0.0:
+            return frame
+
+        now = time.time()
+        with self.lock:
+            if index != self.last_index:
+                self.last_index = index
+                for name in frame:
+                    if self.rng.random() < self.dropout_prob:
+                        self.dropped_until[name] = now + self.dropout_time
+            dropped = [name for name, until in self.dropped_until.items() if until > now]
+
+        if not dropped:
+            return frame
+        frame = dict(frame)
+        for name in dropped:
+            if name in frame:
+                frame[name] = "untracked"
+        return frame
+
+
+# the frame with every body timestamp moved by offset seconds
+def restamp(frame, offset):
+    restamped = {}
+    for name, value in frame.items():
+        if value == "untracked":
+            restamped[name] = value
+        else:
+            (t, _, rest) = value.partition(",")
+            restamped[name] = "{:.4f},".format(float(t) + offset) + rest
+    return restamped
+
+
+# the frame being "captured" right now, looping over the frame list. the timestamps
+# of every further loop are moved on by the loop's duration, so they keep increasing
+class FrameClock():
+    def __init__(self, frames, rate, faults=None):
+        self.frames = frames
+        self.rate = rate
+        self.faults = faults or FaultInjector()
+        self.start = time.time()
+
+    def index(self):
+        return int((time.time() - self.start)*self.rate)
+
+    def frame(self, index=None):
+        if index is None:
+            index = self.index()
+        (loops, i) = divmod(index, len(self.frames))
+        frame = self.frames[i]
+        if loops > 0:
+            frame = restamp(frame, loops*len(self.frames)/float(self.rate))
+        return self.faults.apply_dropouts(frame, index)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes: without this, Nagle + delayed ACK
+    # add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+    clock = None
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        delay = self.clock.faults.request_delay(self.client_address[:2])
+        if delay > 0.0:
+            time.sleep(delay)
+
+        if parts.path == BASE_PATH:
+            self.send_arena(parse_qs(parts.query))
+        elif parts.path == BASE_PATH + "/stream":
+            self.send_stream()
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def send_arena(self, query):
+        frame = self.clock.frame()
+        if "RigidBody" in query:
+            name = query["RigidBody"][0]
+            frame = {name: frame.get(name, "untracked")}
+        self.send_json(200, frame)
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        try:
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client left before the answer: drop the connection quietly
+            self.close_connection = True
+
+    # close-delimited event stream: one event per new frame until the client leaves
+    def send_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.close_connection = True
+
+        last_index = None
+        try:
+            self.end_headers()
+            while True:
+                index = self.clock.index()
+                if index != last_index:
+                    last_index = index
+                    event = "data: " + json.dumps(self.clock.frame(index)) + "\n\n"
+                    self.wfile.write(event.encode("utf-8"))
+                    self.wfile.flush()
+                time.sleep(0.25/self.clock.rate)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def make_server(port, frames, rate, host="127.0.0.1", faults=None):
+    handler = type("Handler", (StandInHandler,), {"clock": FrameClock(frames, rate, faults)})
+    return StandInServer((host, port), handler)
+
+# run a stand-in server in a daemon thread, e.g. from a benchmark script
+def start_in_background(port, frames, rate, host="127.0.0.1", faults=None):
+    server = make_server(port, frames, rate, host, faults)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OptiTrackRestServer stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12345)
+    parser.add_argument("--rate", type=float, default=100.0, help="frames per second")
+    parser.add_argument("--frames", help="recording to replay (one JSON arena dictionary per line, or a FrameRecorder .bin file)")
+    parser.add_argument("--latency", help="response latency distribution, e.g. uniform:0.005,0.05")
+    parser.add_argument("--stall-prob", type=float, default=0.0)
+    parser.add_argument("--stall-time", type=float, default=0.0)
+    parser.add_argument("--first-connection-delay", type=float, default=0.0, help="seconds added to the first request of every new connection")
+    parser.add_argument("--dropout-prob", type=float, default=0.0)
+    parser.add_argument("--dropout-time", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    faults = FaultInjector(args.latency, args.stall_prob, args.stall_time, args.first_connection_delay, args.dropout_prob, args.dropout_time, args.seed)
+    frames = load_frames(args.frames) if args.frames else synthetic_frames(args.rate)
+    server = make_server(args.port, frames, args.rate, args.host, faults)
+    print("Serving " + str(len(frames)) + " frames at http://" + args.host + ":" + str(args.port) + BASE_PATH)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass